@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -82,20 +83,81 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# uwsgi serves app.wsgi with sync workers, asgi serves app.asgi with
+# uvicorn workers and native async read views
+SERVER_MODE = os.environ.get('SERVER_MODE', 'uwsgi')
+ASYNC_VIEWS = SERVER_MODE == 'asgi'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# With DB_POOL=1 connections are borrowed from an in-process pool and
+# returned after each request, otherwise each thread keeps its own
+# connection open for DB_CONN_MAX_AGE seconds. Under ASGI sync code runs
+# in a fresh thread context per request, so a persistent connection is
+# never reused nor closed; without the pool CONN_MAX_AGE is forced to 0
+# there and DB_POOL=1 is the way to reuse connections.
+
+DB_POOL = bool(int(os.environ.get('DB_POOL', 0)))
+DB_CONN_MAX_AGE = (
+    0 if DB_POOL or ASYNC_VIEWS
+    else int(os.environ.get('DB_CONN_MAX_AGE', 60))
+)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.dbpool' if DB_POOL else 'django.db.backends.postgresql'
+        ),
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DB_CONN_HEALTH_CHECKS', 1))
+        ),
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 300))
+AUTH_TOKEN_CACHE_TIMEOUT = int(
+    os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300)
+)
+AUTH_TOKEN_TTL = int(os.environ.get('AUTH_TOKEN_TTL', 24 * 60 * 60))
+AUTH_REVOCATION_CACHE_TIMEOUT = int(
+    os.environ.get('AUTH_REVOCATION_CACHE_TIMEOUT', 30)
+)
+
+
+# Image processing queue
+
+IMAGE_JOB_MAX_ATTEMPTS = int(os.environ.get('IMAGE_JOB_MAX_ATTEMPTS', 5))
+IMAGE_JOB_RETRY_DELAY = int(os.environ.get('IMAGE_JOB_RETRY_DELAY', 30))
+IMAGE_JOB_LOCK_TIMEOUT = int(os.environ.get('IMAGE_JOB_LOCK_TIMEOUT', 600))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -115,6 +177,43 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ['core.hashers.DeferredRehashBackend']
+
+
+# Password hashing, new hashes use the PASSWORD_HASHER profile and the
+# others are kept to verify and upgrade existing hashes
+
+PASSWORD_HASHER_PROFILES = {
+    'scrypt': 'core.hashers.TunedScryptPasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER],
+    *(
+        path for name, path in PASSWORD_HASHER_PROFILES.items()
+        if name != PASSWORD_HASHER
+    ),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14)
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = int(
+    os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 19456)
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 1)
+)
+
+PASSWORD_REHASH_WORKERS = int(os.environ.get('PASSWORD_REHASH_WORKERS', 1))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -137,6 +236,16 @@ MEDIA_URL = '/static/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
+# Resumable uploads are assembled here before moving into MEDIA_ROOT
+CHUNKED_UPLOAD_ROOT = os.environ.get('CHUNKED_UPLOAD_ROOT', '/vol/uploads')
+CHUNKED_UPLOAD_CHUNK_SIZE = int(
+    os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+)
+CHUNKED_UPLOAD_MAX_SIZE = int(
+    os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+)
+CHUNKED_UPLOAD_EXPIRY = int(os.environ.get('CHUNKED_UPLOAD_EXPIRY', 86400))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -146,8 +255,28 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'collection.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
 }
 
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 1000))
+
+SEARCH_CONFIG = os.environ.get('SEARCH_CONFIG', 'english')
+
+AUTOCOMPLETE_MAX_LIMIT = int(os.environ.get('AUTOCOMPLETE_MAX_LIMIT', 50))
+AUTOCOMPLETE_CACHE_SIZE = int(os.environ.get('AUTOCOMPLETE_CACHE_SIZE', 2048))
+AUTOCOMPLETE_CACHE_TIMEOUT = int(
+    os.environ.get('AUTOCOMPLETE_CACHE_TIMEOUT', 60)
+)
+
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Readiness fails when a dependency is down or slower than this
+HEALTH_MAX_LATENCY_MS = float(os.environ.get('HEALTH_MAX_LATENCY_MS', 500))
+HEALTH_PROBE_TTL = float(os.environ.get('HEALTH_PROBE_TTL', 2))
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
\ No newline at end of file
@@ -27,7 +27,19 @@ from core import views as core_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/health-check/', core_views.health_check, name='health-check'),
+    path(
+        'api/health-check/',
+        core_views.async_health_check if settings.ASYNC_VIEWS
+        else core_views.health_check,
+        name='health-check',
+    ),
+    path('api/health/live/', core_views.liveness, name='health-live'),
+    path('api/health/ready/', core_views.readiness, name='health-ready'),
+    path(
+        'api/internal/db-pool/',
+        core_views.DatabasePoolStatsView.as_view(),
+        name='db-pool-stats',
+    ),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
     path(
         'api/docs/',
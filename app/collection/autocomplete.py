@@ -0,0 +1,165 @@
+"""
+Autocomplete for tag and garment names
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import (
+    BooleanField,
+    ExpressionWrapper,
+    Q,
+)
+from django.db.models.functions import Upper
+from django.utils.translation import gettext as _
+from drf_spectacular.utils import (
+    extend_schema,
+    inline_serializer,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core import search
+from collection.cache import get_version
+
+
+DEFAULT_LIMIT = 10
+
+
+class HotPrefixCache:
+    """In-process LRU of recent results with a time to live"""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+
+hot_prefixes = HotPrefixCache(
+    settings.AUTOCOMPLETE_CACHE_SIZE,
+    settings.AUTOCOMPLETE_CACHE_TIMEOUT,
+)
+
+
+def suggest(model, user, term, limit):
+    """Return the best matching names of a user's objects
+
+    With pg_trgm, prefix matches come first and then names ranked by
+    trigram similarity, both served by the UPPER(name) trigram index.
+    Otherwise only case-insensitive prefix matches are returned.
+    """
+    queryset = model.objects.filter(user=user)
+    if search.has_trigram():
+        term = term.upper()
+        prefix = Q(upper_name__startswith=term)
+        queryset = queryset.annotate(
+            upper_name=Upper('name'),
+        ).filter(
+            prefix | Q(upper_name__trigram_similar=term),
+        ).annotate(
+            is_prefix=ExpressionWrapper(prefix, output_field=BooleanField()),
+            similarity=TrigramSimilarity('upper_name', term),
+        ).order_by('-is_prefix', '-similarity', 'name', 'id')
+    else:
+        queryset = queryset.filter(
+            name__istartswith=term,
+        ).order_by('name', 'id')
+
+    return list(queryset.values('id', 'name')[:limit])
+
+
+class AutocompleteMixin:
+    """Suggest names of the user's objects for a typed prefix
+
+    Results are kept in a per-process cache keyed by the user's cache
+    version, so writes by any process make cached suggestions stale.
+    """
+
+    def _autocomplete_limit(self, request):
+        """Return the requested number of suggestions"""
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise serializers.ValidationError(
+                {'limit': [_('A valid integer is required.')]}
+            )
+
+        return max(1, min(limit, settings.AUTOCOMPLETE_MAX_LIMIT))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                description='Prefix or approximate name to complete',
+            ),
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description='Maximum number of suggestions',
+            ),
+        ],
+        responses=inline_serializer(
+            name='Suggestion',
+            fields={
+                'id': serializers.IntegerField(),
+                'name': serializers.CharField(),
+            },
+            many=True,
+        ),
+    )
+    @action(methods=['GET'], detail=False)
+    def autocomplete(self, request):
+        """Return names matching the typed text"""
+        term = request.query_params.get('q', '').strip()
+        limit = self._autocomplete_limit(request)
+        if not term:
+            return Response([])
+
+        model = self.queryset.model
+        key = (
+            model._meta.label,
+            request.user.pk,
+            get_version(request.user.pk),
+            term.upper(),
+            limit,
+        )
+        results = hot_prefixes.get(key)
+        if results is None:
+            results = suggest(model, request.user, term, limit)
+            hot_prefixes.set(key, results)
+
+        return Response(results)
@@ -0,0 +1,271 @@
+"""
+Bulk create, update and delete for collection attributes
+"""
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from drf_spectacular.utils import (
+    extend_schema,
+    inline_serializer,
+)
+from rest_framework import (
+    serializers,
+    status,
+)
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core import (
+    blobs,
+    counters,
+    search,
+)
+from core.models import Collection
+from collection.cache import invalidate_user
+from collection.signals import bulk_write
+
+
+BULK_RESULTS = inline_serializer(
+    name='BulkResults',
+    fields={
+        'results': serializers.ListField(child=serializers.DictField()),
+    },
+)
+
+
+def _is_id(value):
+    """Return whether a value is an integer id, JSON booleans excluded"""
+    return type(value) is int
+
+
+def _result(index, code, **extra):
+    """Return the outcome of one item of a bulk request"""
+    return {'index': index, 'status': code, **extra}
+
+
+class BulkWriteMixin:
+    """Write many objects of a collection attribute in one request
+
+    Valid items are written in a single transaction with bulk_create,
+    bulk_update or one DELETE; invalid items are reported per index.
+    Views set `collection_field` to the Collection relation holding the
+    model, `unique_names` when names are unique per user and
+    `search_indexed` when names are part of collection search vectors.
+    """
+
+    collection_field = None
+    unique_names = False
+    search_indexed = False
+
+    def _bulk_items(self, request):
+        """Return the list of items in the request body"""
+        items = request.data
+        if self.request.method == 'DELETE' and isinstance(items, dict):
+            items = items.get('ids')
+        if not isinstance(items, list):
+            raise serializers.ValidationError(
+                _('Expected a list of items.')
+            )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                _('At most %(max)s items are allowed.') % {
+                    'max': settings.BULK_MAX_ITEMS,
+                }
+            )
+
+        return items
+
+    def _bulk_response(self, results, success):
+        """Return per-item results with 207 if any item failed"""
+        failed = any(result['status'] >= 400 for result in results)
+        code = status.HTTP_207_MULTI_STATUS if failed else success
+
+        return Response({'results': results}, status=code)
+
+    def _taken_names(self, names, exclude_ids=()):
+        """Return names already used by other objects of the user"""
+        if not self.unique_names or not names:
+            return set()
+
+        return set(
+            self.queryset.model.objects.filter(
+                user=self.request.user,
+                name__in=names,
+            ).exclude(pk__in=exclude_ids).values_list('name', flat=True)
+        )
+
+    def _duplicate_error(self, index):
+        """Return the result for a name that is already taken"""
+        msg = _('An object with this name already exists.')
+        return _result(index, 400, errors={'name': [msg]})
+
+    def _touch_collections(self, ids):
+        """Mark collections holding any of the objects as modified"""
+        Collection.objects.filter(
+            **{f'{self.collection_field}__in': ids}
+        ).update(updated_at=timezone.now())
+
+    def _indexed_collections(self, ids):
+        """Return collections whose search vectors include the objects"""
+        if not self.search_indexed:
+            return []
+
+        return list(Collection.objects.filter(
+            **{f'{self.collection_field}__in': ids}
+        ).values_list('pk', flat=True).distinct())
+
+    @extend_schema(request=serializers.ListField(), responses=BULK_RESULTS)
+    @action(methods=['POST', 'PATCH', 'DELETE'], detail=False)
+    def bulk(self, request):
+        """Create, update or delete many objects"""
+        items = self._bulk_items(request)
+        handler = {
+            'POST': self._bulk_create,
+            'PATCH': self._bulk_update,
+            'DELETE': self._bulk_delete,
+        }[request.method]
+        try:
+            return handler(items)
+        except IntegrityError:
+            msg = _('Conflicting concurrent change, please retry.')
+            return Response({'detail': msg}, status=status.HTTP_409_CONFLICT)
+
+    def _bulk_create(self, items):
+        """Create every valid item with one bulk_create"""
+        model = self.queryset.model
+        results = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                pending.append((index, model(
+                    user=self.request.user,
+                    **serializer.validated_data,
+                )))
+            else:
+                results[index] = _result(index, 400, errors=serializer.errors)
+
+        taken = self._taken_names([obj.name for index, obj in pending])
+        objs = []
+        for index, obj in pending:
+            if self.unique_names and obj.name in taken:
+                results[index] = self._duplicate_error(index)
+                continue
+            taken.add(obj.name)
+            objs.append((index, obj))
+
+        if objs:
+            with transaction.atomic(), bulk_write():
+                model.objects.bulk_create([obj for index, obj in objs])
+            invalidate_user(self.request.user.pk)
+
+        for index, obj in objs:
+            data = self.get_serializer(obj).data
+            results[index] = _result(index, 201, data=data)
+
+        return self._bulk_response(results, status.HTTP_201_CREATED)
+
+    def _bulk_update(self, items):
+        """Apply every valid item with one bulk_update"""
+        results = [None] * len(items)
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in items
+        ]
+        objects = self.queryset.model.objects.filter(
+            user=self.request.user,
+        ).in_bulk([pk for pk in ids if _is_id(pk)])
+
+        pending = []
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            obj = objects.get(pk) if _is_id(pk) else None
+            if obj is None:
+                results[index] = _result(index, 404)
+                continue
+            serializer = self.get_serializer(obj, data=item, partial=True)
+            if not serializer.is_valid():
+                results[index] = _result(index, 400, errors=serializer.errors)
+                continue
+            pending.append((index, obj, serializer.validated_data))
+
+        renamed = [
+            (index, obj, data) for index, obj, data in pending
+            if 'name' in data
+        ]
+        taken = self._taken_names(
+            [data['name'] for index, obj, data in renamed],
+            exclude_ids=[obj.pk for index, obj, data in renamed],
+        )
+        now = timezone.now()
+        fields = {'updated_at'}
+        objs = []
+        for index, obj, data in pending:
+            name = data.get('name')
+            if self.unique_names and name is not None and name in taken:
+                results[index] = self._duplicate_error(index)
+                continue
+            if name is not None:
+                taken.add(name)
+            for attr, value in data.items():
+                setattr(obj, attr, value)
+            obj.updated_at = now
+            fields.update(data)
+            objs.append((index, obj))
+
+        updated = [obj for index, obj in objs]
+        if updated:
+            with transaction.atomic(), bulk_write():
+                self.queryset.model.objects.bulk_update(updated, fields)
+                self._touch_collections([obj.pk for obj in updated])
+                if 'name' in fields:
+                    search.update_search_vectors(
+                        self._indexed_collections([obj.pk for obj in updated])
+                    )
+            invalidate_user(self.request.user.pk)
+
+        for index, obj in objs:
+            data = self.get_serializer(obj).data
+            results[index] = _result(index, 200, data=data)
+
+        return self._bulk_response(results, status.HTTP_200_OK)
+
+    def _bulk_delete(self, items):
+        """Delete every owned id with one DELETE"""
+        queryset = self.queryset.model.objects.filter(
+            user=self.request.user,
+            pk__in=[pk for pk in items if _is_id(pk)],
+        )
+        has_image = any(
+            field.name == 'image'
+            for field in self.queryset.model._meta.fields
+        )
+        if has_image:
+            found = dict(queryset.values_list('pk', 'image'))
+        else:
+            found = dict.fromkeys(queryset.values_list('pk', flat=True))
+
+        if found:
+            with transaction.atomic(), bulk_write():
+                self._touch_collections(list(found))
+                indexed = self._indexed_collections(list(found))
+                counters.release_related(self.collection_field, list(found))
+                queryset.filter(pk__in=list(found)).delete()
+                search.update_search_vectors(indexed)
+                for name in filter(None, found.values()):
+                    blobs.release(name)
+            invalidate_user(self.request.user.pk)
+
+        results = [
+            _result(
+                index,
+                204 if _is_id(pk) and pk in found else 404,
+                id=pk,
+            )
+            for index, pk in enumerate(items)
+        ]
+
+        return self._bulk_response(results, status.HTTP_200_OK)
@@ -0,0 +1,154 @@
+"""
+Per-user response cache for collection API
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.response import Response
+
+
+VERSION_KEY = 'collection:version:{user_id}'
+RESPONSE_KEY = 'collection:response:{user_id}:{version}:{digest}'
+STATS_KEYS = {
+    'hits': 'collection:stats:hits',
+    'misses': 'collection:stats:misses',
+}
+
+
+def get_version(user_id):
+    """Return the current cache version for a user"""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+async def aget_version(user_id):
+    """Async counterpart of get_version"""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def invalidate_user(user_id):
+    """Bump the user's version so cached responses are not served"""
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def _response_key(user_id, version, url):
+    """Return the cache key of a response at a cache version"""
+    digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+
+    return RESPONSE_KEY.format(
+        user_id=user_id,
+        version=version,
+        digest=digest,
+    )
+
+
+def response_key(user_id, url):
+    """Return the cache key of a response for a user and URL"""
+    return _response_key(user_id, get_version(user_id), url)
+
+
+async def aresponse_key(user_id, url):
+    """Async counterpart of response_key"""
+    return _response_key(user_id, await aget_version(user_id), url)
+
+
+def record(name):
+    """Increment a hit or miss counter"""
+    key = STATS_KEYS[name]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+async def arecord(name):
+    """Async counterpart of record"""
+    key = STATS_KEYS[name]
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, None):
+            await cache.aincr(key)
+
+
+def get_stats():
+    """Return the hit and miss counters"""
+    values = cache.get_many(STATS_KEYS.values())
+
+    return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+class CachedResponseMixin:
+    """Serve read actions of a viewset from the per-user cache"""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response or build and store it"""
+        key = response_key(request.user.pk, request.build_absolute_uri())
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        record('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """Async counterpart of cached_response"""
+        key = await aresponse_key(
+            request.user.pk,
+            request.build_absolute_uri(),
+        )
+        data = await cache.aget(key)
+        if data is not None:
+            await arecord('hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        await arecord('misses')
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+
+        return response
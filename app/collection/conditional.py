@@ -0,0 +1,135 @@
+"""
+Conditional GET support for collection API
+"""
+import hashlib
+
+from django.db.models import (
+    Count,
+    Max,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    http_date,
+    quote_etag,
+)
+
+
+VALIDATOR_AGGREGATES = {
+    'last_modified': Max('updated_at'),
+    'count': Count('pk'),
+}
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve requests with 304 when unchanged
+
+    Validators come from one aggregate query over the objects in the
+    response, so an unchanged resource is never loaded or serialized.
+    Lists only carry an ETag: deleting a row does not advance the
+    newest remaining updated_at, only the count in the ETag notices.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().alist, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def get_validator_queryset(self):
+        """Return the objects whose state the response reflects"""
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+
+        return queryset
+
+    def _state_queryset(self):
+        """Return the aggregate query behind the validators"""
+        return self.get_validator_queryset().order_by()
+
+    def _validators(self, request, state):
+        """Return the ETag and last modified time from aggregated state"""
+        last_modified = state['last_modified']
+        fingerprint = '|'.join([
+            request.build_absolute_uri(),
+            request.headers.get('Accept', ''),
+            str(request.user.pk),
+            str(state['count']),
+            last_modified.isoformat() if last_modified else '',
+        ])
+        etag = hashlib.md5(
+            fingerprint.encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        if self.action == 'list':
+            last_modified = None
+
+        return quote_etag(etag), last_modified
+
+    def get_validators(self, request):
+        """Return the ETag and last modified time of the response"""
+        state = self._state_queryset().aggregate(**VALIDATOR_AGGREGATES)
+
+        return self._validators(request, state)
+
+    async def aget_validators(self, request):
+        """Async counterpart of get_validators"""
+        state = await self._state_queryset().aaggregate(
+            **VALIDATOR_AGGREGATES
+        )
+
+        return self._validators(request, state)
+
+    def _not_modified(self, request, etag, last_modified):
+        """Return a 304 response if the client copy is current"""
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        return timestamp, get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp,
+        )
+
+    def _set_validators(self, response, etag, timestamp):
+        """Add the validators to a successful response"""
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+
+        return response
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 if the client copy is current, else the response"""
+        etag, last_modified = self.get_validators(request)
+        timestamp, response = self._not_modified(request, etag, last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        return self._set_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, handler, request, *args, **kwargs):
+        """Async counterpart of conditional_response"""
+        etag, last_modified = await self.aget_validators(request)
+        timestamp, response = self._not_modified(request, etag, last_modified)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+
+        return self._set_validators(response, etag, timestamp)
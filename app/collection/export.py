@@ -0,0 +1,184 @@
+"""
+Streaming export of a user's wardrobe
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from core.models import (
+    Collection,
+    Tag,
+    Garment,
+)
+from collection.filters import related_ids
+
+
+CSV_COLUMNS = [
+    'type',
+    'id',
+    'name',
+    'title',
+    'description',
+    'link',
+    'tags',
+    'garments',
+]
+BUFFER_SIZE = 64 * 1024
+
+
+def _querysets(user):
+    """Return the row querysets of an export with their record types"""
+    values = {
+        'tag': Tag.objects.values('id', 'name'),
+        'garment': Garment.objects.values('id', 'name'),
+        'collection': Collection.objects.values(
+            'id',
+            'title',
+            'description',
+            'link',
+        ).annotate(
+            tags=related_ids('tags'),
+            garments=related_ids('garments'),
+        ),
+    }
+
+    return [
+        (kind, queryset.filter(user=user).order_by('id'))
+        for kind, queryset in values.items()
+    ]
+
+
+def export_records(user):
+    """Yield every tag, garment and collection of a user as dicts
+
+    Each queryset is read through a server-side cursor, so only one
+    chunk of rows is held in memory at a time. The rows are read in a
+    transaction lasting as long as the generator: in autocommit Postgres
+    declares the cursors WITH HOLD and builds every row before the first
+    one is fetched.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    with transaction.atomic():
+        for kind, rows in _querysets(user):
+            for row in rows.iterator(chunk_size=chunk_size):
+                yield {'type': kind, **row}
+
+
+async def aexport_records(user):
+    """Async counterpart of export_records
+
+    The transaction is entered and left on the thread running the
+    queries of the request.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    atomic = transaction.atomic()
+    await sync_to_async(atomic.__enter__)()
+    try:
+        for kind, rows in _querysets(user):
+            async for row in rows.aiterator(chunk_size=chunk_size):
+                yield {'type': kind, **row}
+    except BaseException as exc:
+        await sync_to_async(atomic.__exit__)(
+            type(exc),
+            exc,
+            exc.__traceback__,
+        )
+        raise
+    await sync_to_async(atomic.__exit__)(None, None, None)
+
+
+def ndjson_lines():
+    """Return the leading lines and record encoder of NDJSON"""
+    def encode(record):
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
+    return [], encode
+
+
+class _Echo:
+    """File-like object that returns what is written to it"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines():
+    """Return the header and record encoder of CSV
+
+    Id lists are joined by semicolons.
+    """
+    writer = csv.writer(_Echo())
+
+    def encode(record):
+        for key in ('tags', 'garments'):
+            if key in record:
+                record[key] = ';'.join(map(str, record[key]))
+        return writer.writerow(
+            [record.get(column, '') for column in CSV_COLUMNS]
+        )
+
+    return [writer.writerow(CSV_COLUMNS)], encode
+
+
+def _buffered(lines):
+    """Join small lines into larger chunks for the response"""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def _abuffered(lines):
+    """Async counterpart of _buffered"""
+    buffer = []
+    size = 0
+    async for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def encode(lines, records):
+    """Yield an encoded export in chunks"""
+    head, encode_record = lines()
+
+    def rows():
+        yield from head
+        for record in records:
+            yield encode_record(record)
+
+    return _buffered(rows())
+
+
+def aencode(lines, records):
+    """Async counterpart of encode, for an async iterable of records"""
+    head, encode_record = lines()
+
+    async def rows():
+        for line in head:
+            yield line
+        async for record in records:
+            yield encode_record(record)
+
+    return _abuffered(rows())
+
+
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson', 'ndjson'),
+    'csv': (csv_lines, 'text/csv', 'csv'),
+}
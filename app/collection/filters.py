@@ -0,0 +1,102 @@
+"""
+Relation queries for the collection API without join and DISTINCT
+"""
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import connection
+from django.db.models import (
+    Count,
+    Exists,
+    OuterRef,
+)
+
+from core.models import Collection
+
+
+MATCH_MODES = ('any', 'all')
+
+
+def _links(field, ids):
+    """Return rows of a collection relation pointing at any of the ids"""
+    relation = Collection._meta.get_field(field)
+
+    return relation.remote_field.through.objects.filter(
+        **{f'{relation.m2m_reverse_field_name()}__in': ids}
+    )
+
+
+def _owner_ref(field):
+    """Return the lookup of the collection in a relation row"""
+    return Collection._meta.get_field(field).m2m_field_name()
+
+
+def has_related_ids():
+    """Return whether the database can aggregate ids with related_ids"""
+    return connection.vendor == 'postgresql'
+
+
+def related_ids(field):
+    """Return an ordered array of the ids related to the outer collection"""
+    relation = Collection._meta.get_field(field)
+    target = relation.m2m_reverse_name()
+
+    return ArraySubquery(
+        relation.remote_field.through.objects.filter(
+            **{_owner_ref(field): OuterRef('pk')}
+        ).order_by(target).values(target)
+    )
+
+
+def with_any(queryset, field, ids):
+    """Keep collections related to at least one of the ids"""
+    return queryset.filter(Exists(
+        _links(field, ids).filter(**{_owner_ref(field): OuterRef('pk')})
+    ))
+
+
+def with_all(queryset, field, ids):
+    """Keep collections related to every one of the ids"""
+    ids = set(ids)
+    owner = _owner_ref(field)
+    matching = _links(field, ids).values(owner).annotate(
+        matched=Count('pk'),
+    ).filter(matched=len(ids)).values(owner)
+
+    return queryset.filter(pk__in=matching)
+
+
+def without(queryset, field, ids):
+    """Drop collections related to any of the ids"""
+    return queryset.filter(~Exists(
+        _links(field, ids).filter(**{_owner_ref(field): OuterRef('pk')})
+    ))
+
+
+def filter_related(queryset, field, ids=None, exclude=None, match='any'):
+    """Apply inclusion and exclusion filters for one relation"""
+    if ids:
+        queryset = (with_all if match == 'all' else with_any)(
+            queryset, field, ids,
+        )
+    if exclude:
+        queryset = without(queryset, field, exclude)
+
+    return queryset
+
+
+def _holders(field):
+    """Return relation rows of the outer tag or garment"""
+    relation = Collection._meta.get_field(field)
+
+    return relation.remote_field.through.objects.filter(
+        **{relation.m2m_reverse_field_name(): OuterRef('pk')}
+    )
+
+
+def assigned(queryset, field):
+    """Keep tags or garments used by at least one collection"""
+    return queryset.filter(Exists(_holders(field)))
+
+
+def unassigned(queryset, field):
+    """Keep tags or garments not used by any collection"""
+    return queryset.filter(~Exists(_holders(field)))
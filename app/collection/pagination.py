@@ -0,0 +1,196 @@
+"""
+Pagination for collection API
+"""
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    replace_query_param,
+)
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset pagination over the view's unique ordering.
+
+    The cursor stores the ordering values of the last row seen, so every
+    page is fetched with a `WHERE (name, id) < (...)` style filter instead
+    of an OFFSET scan. The view's `ordering` must end with a unique field.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results from the queryset"""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of paginate_queryset"""
+        queryset = self._page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+
+        return self._set_page([obj async for obj in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        """Return the slice of the queryset holding the page and one more"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+        ordering = self._reverse_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            position = self._clean_position(queryset, self.cursor.position)
+            queryset = queryset.filter(
+                self._keyset_filter(ordering, position)
+            )
+
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        """Keep the page from the fetched rows and note adjacent pages"""
+        reverse = self.cursor.reverse if self.cursor else False
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering declared on the view as a tuple"""
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        return tuple(ordering)
+
+    def get_next_link(self):
+        """Return the link to the page after this one"""
+        if not self.has_next or not self.page:
+            return None
+
+        position = self._get_position_from_instance(
+            self.page[-1], self.ordering
+        )
+        return self.encode_cursor(Cursor(0, False, position))
+
+    def get_previous_link(self):
+        """Return the link to the page before this one"""
+        if not self.has_previous or not self.page:
+            return None
+
+        position = self._get_position_from_instance(
+            self.page[0], self.ordering
+        )
+        return self.encode_cursor(Cursor(0, True, position))
+
+    def decode_cursor(self, request):
+        """Decode the opaque cursor from the request, if any"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            reverse, position = json.loads(
+                base64.urlsafe_b64decode(padded.encode('ascii'))
+            )
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=bool(reverse), position=position)
+
+    def _clean_position(self, queryset, position):
+        """Convert cursor values to their field types, 404 if invalid"""
+        annotations = queryset.query.annotations
+        values = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            try:
+                if name in annotations:
+                    output = annotations[name].output_field
+                else:
+                    output = queryset.model._meta.get_field(name)
+                value = output.to_python(value)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+
+        return values
+
+    def encode_cursor(self, cursor):
+        """Encode a cursor into an opaque URL"""
+        payload = json.dumps(
+            [cursor.reverse, cursor.position],
+            separators=(',', ':'),
+        )
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode('ascii')
+
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            encoded.rstrip('='),
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        """Return the ordering values of an instance"""
+        return [
+            getattr(instance, field.lstrip('-')) for field in ordering
+        ]
+
+    def _reverse_ordering(self):
+        """Flip the direction of every ordering field"""
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def _keyset_filter(self, ordering, position):
+        """Build a row-value comparison for rows after the position"""
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {
+                prior.lstrip('-'): value
+                for prior, value in zip(ordering[:index], position)
+            }
+            clauses.append(
+                Q(**equal, **{f'{name}__{lookup}': position[index]})
+            )
+
+        return reduce(or_, clauses)
@@ -1,12 +1,33 @@
 """
 Serializers for collection API
 """
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import (
+    IntegrityError,
+    transaction,
+)
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
 from rest_framework import serializers
 
+from core import (
+    blobs,
+    images,
+    jobs,
+    uploads,
+)
 from core.models import (
     Collection,
+    ImageStatus,
     Tag,
     Garment,
+    UploadSession,
 )
 
 
@@ -18,8 +39,9 @@ class GarmentSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "name",
+            "collection_count",
         ]
-        read_only_fields = ["id"]
+        read_only_fields = ["id", "collection_count"]
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -27,41 +49,177 @@ class TagSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tag
-        fields = ["id", "name"]
-        read_only_fields = ["id"]
+        fields = ["id", "name", "collection_count"]
+        read_only_fields = ["id", "collection_count"]
+
+    def update(self, instance, validated_data):
+        """Update tag, rejecting names the user already has"""
+        name = validated_data.get("name", instance.name)
+        duplicate = Tag.objects.filter(
+            user=instance.user,
+            name=name,
+        ).exclude(pk=instance.pk)
+        msg = _("A tag with this name already exists.")
+        if duplicate.exists():
+            raise serializers.ValidationError({"name": [msg]})
+
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            # Lost a race with a concurrent rename to the same name
+            raise serializers.ValidationError({"name": [msg]})
+
+
+def _param_set(params, name):
+    """Return the comma separated names of a query parameter, or None"""
+    value = params.get(name)
+    if value is None:
+        return None
+
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def select_fields(params, names):
+    """Return the field names kept by ?fields= and ?omit="""
+    fields = _param_set(params, "fields")
+    omit = _param_set(params, "omit") or set()
+
+    return [
+        name for name in names
+        if (fields is None or name in fields) and name not in omit
+    ]
+
+
+def expanded_fields(params):
+    """Return the relations requested with ?expand="""
+    return _param_set(params, "expand") or set()
+
+
+class SparseFieldsMixin:
+    """Shape the output with ?fields=, ?omit= and ?expand=
+
+    Relations in `expandable_fields` are nested objects only when
+    expanded and lists of ids otherwise, read from a `<name>_ids`
+    annotation when the queryset provides one.
+    """
+
+    expandable_fields = ()
 
+    def _params(self):
+        """Return the query parameters of the request, if any"""
+        request = self.context.get("request")
 
-class CollectionSerializer(serializers.ModelSerializer):
+        return request.query_params if request is not None else {}
+
+    def _related_ids(self, instance, name):
+        """Return the sorted ids of an unexpanded relation"""
+        ids = getattr(instance, f"{name}_ids", None)
+        if ids is None:
+            ids = sorted(obj.pk for obj in getattr(instance, name).all())
+
+        return ids
+
+    def to_representation(self, instance):
+        """Serialize only the selected fields"""
+        params = self._params()
+        readable = list(self._readable_fields)
+        names = set(select_fields(params, [f.field_name for f in readable]))
+        expanded = expanded_fields(params)
+
+        ret = {}
+        for field in readable:
+            name = field.field_name
+            if name not in names:
+                continue
+            if name in self.expandable_fields and name not in expanded:
+                ret[name] = self._related_ids(instance, name)
+                continue
+            attribute = field.get_attribute(instance)
+            ret[name] = (
+                None if attribute is None
+                else field.to_representation(attribute)
+            )
+
+        return ret
+
+
+class CollectionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for collections"""
 
+    expandable_fields = ("tags", "garments")
+
     tags = TagSerializer(many=True, required=False)
     garments = GarmentSerializer(many=True, required=False)
 
     class Meta:
         model = Collection
-        fields = ["id", "title", "link", "tags", "garments"]
-        read_only_fields = ["id"]
+        fields = [
+            "id",
+            "title",
+            "link",
+            "tags",
+            "garments",
+            "tag_count",
+            "garment_count",
+        ]
+        read_only_fields = ["id", "tag_count", "garment_count"]
 
-    def _get_or_create_tags(self, tags, collection):
-        """Handle getting or creating tags as needed"""
+    def _lock_user(self, auth_user):
+        """Serialize concurrent tag and garment creation for a user"""
+        if not getattr(self, "_user_locked", False):
+            list(
+                get_user_model().objects.select_for_update()
+                .filter(pk=auth_user.pk).values_list("pk", flat=True)
+            )
+            self._user_locked = True
+
+    def _get_or_create_named(self, model, items, unique=False):
+        """Return objects for the named items, creating missing in bulk
+
+        Models with a unique (user, name) constraint are upserted with
+        `ON CONFLICT DO NOTHING`; others lock the user row instead.
+        """
         auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, create = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
+        names = list(dict.fromkeys(item["name"] for item in items))
+        if not names:
+            return []
+
+        queryset = model.objects.filter(user=auth_user)
+        objs = {obj.name: obj for obj in queryset.filter(name__in=names)}
+        missing = [name for name in names if name not in objs]
+        if missing and unique:
+            model.objects.bulk_create(
+                [model(user=auth_user, name=name) for name in missing],
+                ignore_conflicts=True,
+            )
+            objs.update(
+                (obj.name, obj) for obj in queryset.filter(name__in=missing)
             )
-            collection.tags.add(tag_obj)
+        elif missing:
+            self._lock_user(auth_user)
+            objs.update(
+                (obj.name, obj) for obj in queryset.filter(name__in=missing)
+            )
+            created = model.objects.bulk_create([
+                model(user=auth_user, name=name)
+                for name in missing if name not in objs
+            ])
+            objs.update((obj.name, obj) for obj in created)
+
+        return [objs[name] for name in names]
+
+    def _get_or_create_tags(self, tags, collection):
+        """Handle getting or creating tags as needed"""
+        collection.tags.add(
+            *self._get_or_create_named(Tag, tags, unique=True)
+        )
 
     def _get_or_create_garments(self, garments, collection):
         """Handle gettings or creating garments as needed"""
-        auth_user = self.context["request"].user
-        for garment in garments:
-            garment_obj, create = Garment.objects.get_or_create(
-                user=auth_user,
-                **garment,
-            )
-            collection.garments.add(garment_obj)
+        collection.garments.add(*self._get_or_create_named(Garment, garments))
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a collection"""
         tags = validated_data.pop("tags", [])
@@ -72,6 +230,7 @@ class CollectionSerializer(serializers.ModelSerializer):
 
         return collection
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update collection"""
         tags = validated_data.pop("tags", None)
@@ -80,7 +239,7 @@ class CollectionSerializer(serializers.ModelSerializer):
             instance.tags.clear()
             self._get_or_create_tags(tags, instance)
 
-        elif garments is not None:
+        if garments is not None:
             instance.garments.clear()
             self._get_or_create_garments(garments, instance)
 
@@ -98,21 +257,133 @@ class CollectionDetailSerializer(CollectionSerializer):
         fields = CollectionSerializer.Meta.fields + ["description"]
 
 
-class CollectionImageSerializer(serializers.ModelSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    """Queue and expose resized variants of an uploaded image"""
+
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, obj):
+        """Return absolute URLs of the variants once they are ready"""
+        if not obj.image or obj.image_status != ImageStatus.READY:
+            return None
+
+        request = self.context.get("request")
+        urls = images.variant_urls(obj.image)
+        if request is not None:
+            for formats in urls.values():
+                for fmt, url in formats.items():
+                    formats[fmt] = request.build_absolute_uri(url)
+
+        return urls
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Store the image by content and queue its variants"""
+        old_name = instance.image.name
+        blob = blobs.store(validated_data["image"])
+        validated_data["image"] = blob.name
+        validated_data["image_status"] = ImageStatus.PENDING
+        instance = super().update(instance, validated_data)
+        if old_name:
+            blobs.release(old_name)
+        jobs.enqueue_image_job(instance)
+
+        return instance
+
+
+class CollectionImageSerializer(
+    ImageVariantsMixin,
+    serializers.ModelSerializer,
+):
     """Serializer for upload images to collection"""
 
     class Meta:
         model = Collection
-        fields = ['id', 'image']
-        read_only_fields = ['id']
+        fields = ['id', 'image', 'image_status', 'image_variants']
+        read_only_fields = ['id', 'image_status']
         extra_kwargs = {'image': {'required': 'True'}}
 
 
-class GarmentImageSerializer(serializers.ModelSerializer):
+class GarmentImageSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     """Serializer for uploading imaged for a garment"""
 
     class Meta:
         model = Garment
-        fields = ['id', 'image']
-        read_only_fields = ['id']
+        fields = ['id', 'image', 'image_status', 'image_variants']
+        read_only_fields = ['id', 'image_status']
         extra_kwargs = {'image': {'required': 'True'}}
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions"""
+
+    TARGETS = {
+        "collection": Collection,
+        "garment": Garment,
+    }
+
+    target = serializers.ChoiceField(choices=list(TARGETS), write_only=True)
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "target",
+            "object_id",
+            "filename",
+            "size",
+            "checksum",
+            "chunk_size",
+            "total_chunks",
+            "received_chunks",
+            "status",
+            "expires_at",
+        ]
+        read_only_fields = ["id", "chunk_size", "status", "expires_at"]
+
+    def get_received_chunks(self, obj):
+        """Return the indexes of chunks already stored"""
+        return uploads.received_chunks(obj)
+
+    def validate_size(self, value):
+        """Reject empty and oversized files"""
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            msg = _("File size must be between 1 and %(max)s bytes.") % {
+                "max": settings.CHUNKED_UPLOAD_MAX_SIZE,
+            }
+            raise serializers.ValidationError(msg)
+
+        return value
+
+    def validate_checksum(self, value):
+        """Require a hex encoded SHA-256 digest"""
+        if not re.fullmatch(r"[0-9a-fA-F]{64}", value):
+            msg = _("Checksum must be a hex encoded SHA-256 digest.")
+            raise serializers.ValidationError(msg)
+
+        return value.lower()
+
+    def validate(self, attrs):
+        """Check the target object belongs to the user"""
+        model = self.TARGETS[attrs.pop("target")]
+        auth_user = self.context["request"].user
+        owned = model.objects.filter(user=auth_user, pk=attrs["object_id"])
+        if not owned.exists():
+            msg = _("No such %(target)s.") % {
+                "target": model._meta.verbose_name,
+            }
+            raise serializers.ValidationError({"object_id": [msg]})
+
+        attrs["content_type"] = ContentType.objects.get_for_model(model)
+        return attrs
+
+    def create(self, validated_data):
+        """Create an upload session with the configured chunk size"""
+        validated_data["chunk_size"] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
+        validated_data["expires_at"] = timezone.now() + timedelta(
+            seconds=settings.CHUNKED_UPLOAD_EXPIRY,
+        )
+
+        return super().create(validated_data)
@@ -0,0 +1,252 @@
+"""
+Signal handlers for collection API
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import (
+    blobs,
+    counters,
+    search,
+)
+from core.models import (
+    Collection,
+    Tag,
+    Garment,
+)
+from collection.cache import invalidate_user
+
+
+_bulk_write = ContextVar('bulk_write', default=False)
+
+
+@contextmanager
+def bulk_write():
+    """Skip per-object handlers while set-based code does their work"""
+    token = _bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_write.reset(token)
+
+
+def unless_bulk(handler):
+    """Run a signal handler only outside of bulk_write()"""
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _bulk_write.get():
+            return handler(*args, **kwargs)
+
+    return wrapper
+
+
+def _invalidate_on_commit(user_id):
+    """Bump the user's cache version after the write is committed
+
+    Bumping earlier would let a read between the bump and the commit
+    cache the old rows under the new version.
+    """
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+def _touch(model, pks):
+    """Mark objects as modified without sending save signals"""
+    model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Garment)
+@receiver(post_delete, sender=Collection)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Garment)
+@unless_bulk
+def invalidate_on_write(sender, instance, **kwargs):
+    """Invalidate cached responses of the object's owner once committed"""
+    _invalidate_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Garment)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Garment)
+@unless_bulk
+def touch_collections(sender, instance, created=False, **kwargs):
+    """Mark collections embedding a changed tag or garment as modified"""
+    if not created:
+        collections = instance.collection_set.values_list('pk', flat=True)
+        _touch(Collection, list(collections))
+
+
+@receiver(post_delete, sender=Collection)
+@receiver(post_delete, sender=Garment)
+@unless_bulk
+def release_image(sender, instance, **kwargs):
+    """Drop the deleted object's reference to its stored image"""
+    if instance.image:
+        blobs.release(instance.image.name)
+
+
+@receiver(m2m_changed, sender=Collection.tags.through)
+@receiver(m2m_changed, sender=Collection.garments.through)
+@unless_bulk
+def touch_on_relation_change(
+    sender, instance, action, model, pk_set, **kwargs
+):
+    """Mark both sides of a changed relation as modified"""
+    if action == 'pre_clear':
+        fields = {
+            field.related_model: field.attname
+            for field in sender._meta.fields if field.is_relation
+        }
+        pk_set = list(
+            sender.objects.filter(
+                **{fields[type(instance)]: instance.pk}
+            ).values_list(fields[model], flat=True)
+        )
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    _touch(type(instance), [instance.pk])
+    _touch(model, pk_set)
+
+
+@receiver(m2m_changed, sender=Collection.tags.through)
+@receiver(m2m_changed, sender=Collection.garments.through)
+@unless_bulk
+def invalidate_on_relation_change(sender, instance, action, **kwargs):
+    """Invalidate cached responses when collection relations change"""
+    if action.startswith('post_'):
+        _invalidate_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=Collection)
+@unless_bulk
+def index_collection(sender, instance, update_fields=None, **kwargs):
+    """Refresh the search vector of a saved collection"""
+    if update_fields is None or {'title', 'description'} & set(update_fields):
+        search.update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Garment)
+@unless_bulk
+def index_renamed_garment(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """Refresh the search vectors of collections holding a garment"""
+    if not created and (update_fields is None or 'name' in update_fields):
+        search.update_search_vectors(
+            instance.collection_set.values_list('pk', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Garment)
+@unless_bulk
+def remember_garment_collections(sender, instance, **kwargs):
+    """Keep the collections of a garment to reindex after its deletion"""
+    instance._indexed_collections = list(
+        instance.collection_set.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Garment)
+@unless_bulk
+def index_deleted_garment(sender, instance, **kwargs):
+    """Refresh the search vectors of collections that held a garment"""
+    search.update_search_vectors(
+        getattr(instance, '_indexed_collections', [])
+    )
+
+
+@receiver(m2m_changed, sender=Collection.garments.through)
+@unless_bulk
+def index_on_garment_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Refresh search vectors when garments are added or removed"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.update_search_vectors([instance.pk])
+    elif action == 'pre_clear':
+        remember_garment_collections(sender, instance)
+    elif action == 'post_clear':
+        index_deleted_garment(sender, instance)
+    elif action in ('post_add', 'post_remove'):
+        search.update_search_vectors(pk_set)
+
+
+def _relation_field(sender):
+    """Return the Collection field of a relation table"""
+    return next(
+        field for field in counters.COLLECTION_COUNTERS
+        if getattr(Collection, field).through is sender
+    )
+
+
+@receiver(m2m_changed, sender=Collection.tags.through)
+@receiver(m2m_changed, sender=Collection.garments.through)
+@unless_bulk
+def count_relation_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    """Keep relation counters in step with added and removed links
+
+    The touched objects are recounted from the link table rather than
+    shifted by the requested change, which may overlap a concurrent one.
+    """
+    if action == 'pre_clear':
+        columns = {
+            field.related_model: field.attname
+            for field in sender._meta.fields if field.is_relation
+        }
+        instance._unlinked = list(
+            sender.objects.filter(
+                **{columns[type(instance)]: instance.pk}
+            ).values_list(columns[model], flat=True)
+        )
+        return
+
+    if action in ('post_add', 'post_remove'):
+        pks = list(pk_set)
+    elif action == 'post_clear':
+        pks = instance.__dict__.pop('_unlinked', [])
+    else:
+        return
+    if not pks:
+        return
+
+    field = _relation_field(sender)
+    if reverse:
+        counters.recount_links(field, pks, [instance.pk])
+        counter = counters.RELATED_COUNTER
+    else:
+        counters.recount_links(field, [instance.pk], pks)
+        counter = counters.COLLECTION_COUNTERS[field]
+    instance.refresh_from_db(fields=[counter])
+
+
+@receiver(pre_delete, sender=Collection)
+@unless_bulk
+def release_collection_counts(sender, instance, **kwargs):
+    """Decrement tags and garments of a collection being deleted"""
+    counters.release_collections([instance.pk])
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Garment)
+@unless_bulk
+def release_related_counts(sender, instance, **kwargs):
+    """Decrement collections holding a tag or garment being deleted"""
+    field = 'tags' if sender is Tag else 'garments'
+    counters.release_related(field, [instance.pk])
@@ -0,0 +1,175 @@
+"""
+Tests for async read views served under ASGI
+"""
+import json
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    sync_to_async,
+)
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import tokens
+from core.models import (
+    Collection,
+    Tag,
+)
+from collection import views
+from user.views import ManageUserView
+
+
+@override_settings(ASYNC_VIEWS=True)
+class AsyncReadViewTests(TestCase):
+    """Test async list and retrieve match the sync views"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.key, expires_at = tokens.issue(self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Beach')
+        self.collection = Collection.objects.create(
+            user=self.user,
+            title='Summer',
+        )
+        self.collection.tags.add(self.tag)
+        Collection.objects.create(user=self.user, title='Winter')
+        self.factory = AsyncRequestFactory()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    async def call(self, view, method, path, data=None, key=None, **kwargs):
+        """Call an async view and return the response"""
+        headers = {'authorization': f'Token {key or self.key}'}
+        request = getattr(self.factory, method)(
+            path,
+            data,
+            headers=headers,
+            **({'content_type': 'application/json'}
+               if method != 'get' else {}),
+        )
+
+        return await view(request, **kwargs)
+
+    async def sync_get(self, path, data=None):
+        """Return the body the sync view returns"""
+        res = await sync_to_async(self.client.get)(path, data)
+
+        return res.json()
+
+    async def test_list_matches_sync(self):
+        """Test the async list returns the sync page"""
+        view = views.CollectionViewSet.as_view({'get': 'list'})
+        url = reverse('collection:collection-list')
+        params = {'page_size': 1, 'expand': 'tags'}
+
+        res = await self.call(view, 'get', url, params)
+
+        self.assertTrue(iscoroutinefunction(view))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        body = json.loads(res.content)
+        cache.clear()
+        self.assertEqual(body, await self.sync_get(url, params))
+        self.assertIsNotNone(body['next'])
+
+    async def test_retrieve_matches_sync(self):
+        """Test the async retrieve returns the sync body"""
+        view = views.CollectionViewSet.as_view({'get': 'retrieve'})
+        url = reverse(
+            'collection:collection-detail',
+            args=[self.collection.id],
+        )
+
+        res = await self.call(view, 'get', url, pk=str(self.collection.id))
+
+        self.assertEqual(res.status_code, 200)
+        cache.clear()
+        self.assertEqual(json.loads(res.content), await self.sync_get(url))
+
+    async def test_retrieve_other_user_not_found(self):
+        """Test objects of other users are not found"""
+        other = await get_user_model().objects.acreate(email='o@example.com')
+        tag = await Tag.objects.acreate(user=other, name='Theirs')
+        view = views.TagViewSet.as_view({'get': 'retrieve'})
+
+        res = await self.call(view, 'get', '/', pk=str(tag.id))
+
+        self.assertEqual(res.status_code, 404)
+
+    async def test_conditional_and_cached(self):
+        """Test repeated requests hit the cache and honour ETags"""
+        view = views.TagViewSet.as_view({'get': 'list'})
+        first = await self.call(view, 'get', '/')
+        second = await self.call(view, 'get', '/')
+
+        self.assertEqual(second['X-Cache'], 'HIT')
+        request = self.factory.get('/', headers={
+            'authorization': f'Token {self.key}',
+            'if-none-match': first['ETag'],
+        })
+        res = await view(request)
+        self.assertEqual(res.status_code, 304)
+
+    async def test_authentication_required(self):
+        """Test bad tokens are rejected with 401"""
+        view = views.TagViewSet.as_view({'get': 'list'})
+
+        res = await self.call(view, 'get', '/', key='bad:token')
+
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    async def test_invalid_filter(self):
+        """Test query validation errors return 400"""
+        view = views.CollectionViewSet.as_view({'get': 'list'})
+
+        res = await self.call(view, 'get', '/', {'match': 'some'})
+
+        self.assertEqual(res.status_code, 400)
+
+    async def test_writes_use_sync_view(self):
+        """Test other methods are served by the sync view"""
+        view = views.TagViewSet.as_view({
+            'get': 'retrieve',
+            'patch': 'partial_update',
+        })
+
+        res = await self.call(
+            view, 'patch', '/', json.dumps({'name': 'Sea'}),
+            pk=str(self.tag.id),
+        )
+
+        self.assertEqual(res.status_code, 200)
+        await self.tag.arefresh_from_db()
+        self.assertEqual(self.tag.name, 'Sea')
+
+    async def test_manage_user_retrieve(self):
+        """Test the profile is served by the async view"""
+        view = ManageUserView.as_view()
+
+        res = await self.call(view, 'get', '/')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(json.loads(res.content)['email'], self.user.email)
+
+    async def test_legacy_token(self):
+        """Test unsigned tokens authenticate asynchronously"""
+        token = await Token.objects.acreate(user=self.user)
+        view = ManageUserView.as_view()
+
+        res = await self.call(view, 'get', '/', key=token.key)
+
+        self.assertEqual(res.status_code, 200)
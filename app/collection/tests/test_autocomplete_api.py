@@ -0,0 +1,105 @@
+"""
+Tests for the tag and garment autocomplete endpoints
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import search
+from core.models import (
+    Garment,
+    Tag,
+)
+from collection.autocomplete import hot_prefixes
+
+
+TAGS_AUTOCOMPLETE_URL = reverse("collection:tag-autocomplete")
+GARMENTS_AUTOCOMPLETE_URL = reverse("collection:garment-autocomplete")
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class AutocompleteAPITests(TestCase):
+    """Test suggesting tag and garment names"""
+
+    def setUp(self):
+        cache.clear()
+        hot_prefixes.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, url, **params):
+        """Return the suggested names"""
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+
+        return [item["name"] for item in res.data]
+
+    def test_prefix_matches(self):
+        """Test names starting with the text are suggested"""
+        for name in ("Summer", "Sunday", "Winter"):
+            Tag.objects.create(user=self.user, name=name)
+        other = create_user(email="other@example.com")
+        Tag.objects.create(user=other, name="Sun")
+
+        self.assertEqual(
+            self.names(TAGS_AUTOCOMPLETE_URL, q="su"),
+            ["Summer", "Sunday"],
+        )
+        self.assertEqual(self.names(TAGS_AUTOCOMPLETE_URL, q=""), [])
+
+    def test_limit(self):
+        """Test the number of suggestions is limited"""
+        for i in range(5):
+            Garment.objects.create(user=self.user, name=f"Shirt {i}")
+
+        names = self.names(GARMENTS_AUTOCOMPLETE_URL, q="shirt", limit=2)
+
+        self.assertEqual(names, ["Shirt 0", "Shirt 1"])
+
+    def test_invalid_limit(self):
+        """Test a non numeric limit is rejected"""
+        res = self.client.get(TAGS_AUTOCOMPLETE_URL, {"q": "a", "limit": "x"})
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_hot_prefix_cached(self):
+        """Test repeated prefixes are served without queries"""
+        Tag.objects.create(user=self.user, name="Summer")
+        self.names(TAGS_AUTOCOMPLETE_URL, q="sum")
+
+        with self.assertNumQueries(0):
+            names = self.names(TAGS_AUTOCOMPLETE_URL, q="sum")
+
+        self.assertEqual(names, ["Summer"])
+
+    def test_cache_invalidated_on_write(self):
+        """Test new names are suggested after a write"""
+        Tag.objects.create(user=self.user, name="Summer")
+        self.names(TAGS_AUTOCOMPLETE_URL, q="sum")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(user=self.user, name="Summit")
+
+        self.assertEqual(
+            self.names(TAGS_AUTOCOMPLETE_URL, q="sum"),
+            ["Summer", "Summit"],
+        )
+
+    def test_fuzzy_matches(self):
+        """Test similar names are suggested after prefix matches"""
+        if not search.has_trigram():
+            self.skipTest("pg_trgm is not installed")
+        Garment.objects.create(user=self.user, name="Cardigan")
+        Garment.objects.create(user=self.user, name="Card holder")
+
+        names = self.names(GARMENTS_AUTOCOMPLETE_URL, q="cardigna")
+
+        self.assertEqual(names[0], "Cardigan")
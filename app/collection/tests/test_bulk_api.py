@@ -0,0 +1,166 @@
+"""
+Tests for the bulk tag and garment endpoints
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Garment,
+    Tag,
+)
+
+
+TAGS_BULK_URL = reverse("collection:tag-bulk")
+GARMENTS_BULK_URL = reverse("collection:garment-bulk")
+COLLECTION_URL = reverse("collection:collection-list")
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class BulkAPITests(TestCase):
+    """Test bulk writes of tags and garments"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_garments(self):
+        """Test creating many garments in a fixed number of queries"""
+        payload = [{"name": f"Garment {i}"} for i in range(100)]
+
+        with self.assertNumQueries(3):
+            res = self.client.post(GARMENTS_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Garment.objects.filter(user=self.user).count(), 100)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            [201] * 100,
+        )
+        self.assertIsNotNone(res.data["results"][0]["data"]["id"])
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test invalid and duplicate items fail without blocking others"""
+        Tag.objects.create(user=self.user, name="Summer")
+        payload = [
+            {"name": "Winter"},
+            {"name": ""},
+            {"name": "Summer"},
+            {"name": "Winter"},
+        ]
+
+        res = self.client.post(TAGS_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, 207)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            [201, 400, 400, 400],
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_update_tags(self):
+        """Test renaming many tags at once"""
+        tags = [
+            Tag.objects.create(user=self.user, name=f"Tag {i}")
+            for i in range(3)
+        ]
+        other = Tag.objects.create(
+            user=create_user(email="other@example.com"),
+            name="Theirs",
+        )
+        payload = [
+            {"id": tags[0].id, "name": "Spring"},
+            {"id": tags[1].id, "name": "Fall"},
+            {"id": other.id, "name": "Mine"},
+        ]
+
+        res = self.client.patch(TAGS_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, 207)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            [200, 200, 404],
+        )
+        tags[0].refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(tags[0].name, "Spring")
+        self.assertEqual(other.name, "Theirs")
+
+    def test_bulk_update_refreshes_collections(self):
+        """Test renamed garments show up in cached collection lists"""
+        garment = Garment.objects.create(user=self.user, name="Coat")
+        collection = Collection.objects.create(user=self.user, title="Fall")
+        collection.garments.add(garment)
+        self.client.get(COLLECTION_URL, {"expand": "garments"})
+
+        self.client.patch(
+            GARMENTS_BULK_URL,
+            [{"id": garment.id, "name": "Jacket"}],
+            format="json",
+        )
+        res = self.client.get(COLLECTION_URL, {"expand": "garments"})
+
+        garments = res.data["results"][0]["garments"]
+        self.assertEqual(garments[0]["name"], "Jacket")
+
+    def test_bulk_delete(self):
+        """Test deleting many garments with per-id results"""
+        garments = [
+            Garment.objects.create(user=self.user, name=f"Garment {i}")
+            for i in range(3)
+        ]
+        collection = Collection.objects.create(user=self.user, title="Fall")
+        collection.garments.add(*garments)
+        ids = [garment.id for garment in garments[:2]] + [0]
+
+        res = self.client.delete(
+            GARMENTS_BULK_URL,
+            {"ids": ids},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, 207)
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]],
+            [204, 204, 404],
+        )
+        self.assertEqual(
+            list(collection.garments.values_list("id", flat=True)),
+            [garments[2].id],
+        )
+
+    def test_bulk_boolean_ids_rejected(self):
+        """Test JSON booleans are not taken for ids"""
+        tag = Tag.objects.create(pk=1, user=self.user, name="Summer")
+
+        res = self.client.patch(
+            TAGS_BULK_URL,
+            [{"id": True, "name": "Winter"}],
+            format="json",
+        )
+        self.assertEqual(res.data["results"][0]["status"], 404)
+
+        res = self.client.delete(
+            TAGS_BULK_URL,
+            {"ids": [True]},
+            format="json",
+        )
+        self.assertEqual(res.data["results"][0]["status"], 404)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Summer")
+
+    def test_bulk_requires_list(self):
+        """Test a non-list body is rejected"""
+        res = self.client.post(TAGS_BULK_URL, {"name": "x"}, format="json")
+
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,132 @@
+"""
+Tests for the per-user response cache
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Tag,
+)
+from collection.cache import get_version
+
+
+COLLECTION_URL = reverse("collection:collection-list")
+TAGS_URL = reverse("collection:tag-list")
+STATS_URL = reverse("collection:cache-stats")
+
+
+def detail_url(collection_id):
+    """Create and return collection details URL"""
+    return reverse("collection:collection-detail", args=[collection_id])
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class ResponseCacheTests(TestCase):
+    """Test caching of collection read endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_second_list_served_from_cache(self):
+        """Test repeated list requests skip loading and serializing"""
+        Collection.objects.create(user=self.user, title='Summer')
+        first = self.client.get(COLLECTION_URL)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(COLLECTION_URL)
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_update_invalidates_detail(self):
+        """Test updating a collection invalidates its cached detail"""
+        collection = Collection.objects.create(user=self.user, title='Old')
+        url = detail_url(collection.id)
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {'title': 'New'})
+        res = self.client.get(url)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['title'], 'New')
+
+    def test_invalidation_waits_for_commit(self):
+        """Test the cache version is only bumped once the write commits"""
+        collection = Collection.objects.create(user=self.user, title='Old')
+        tag = Tag.objects.create(user=self.user, name='Summer')
+        version = get_version(self.user.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            collection.title = 'New'
+            collection.save()
+            collection.tags.add(tag)
+            self.client.get(COLLECTION_URL)
+            self.assertEqual(get_version(self.user.id), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_version(self.user.id), version)
+
+    def test_tag_rename_invalidates_collections(self):
+        """Test renaming a tag refreshes collections that embed it"""
+        collection = Collection.objects.create(user=self.user, title='Beach')
+        tag = Tag.objects.create(user=self.user, name='Summer')
+        collection.tags.add(tag)
+        self.client.get(COLLECTION_URL, {'expand': 'tags'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('collection:tag-detail', args=[tag.id]),
+                {'name': 'Sunny'},
+            )
+        res = self.client.get(COLLECTION_URL, {'expand': 'tags'})
+
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Sunny')
+
+    def test_cache_is_per_user(self):
+        """Test cached responses are not shared between users"""
+        other = create_user(email='other@example.com')
+        Tag.objects.create(user=other, name='Theirs')
+        Tag.objects.create(user=self.user, name='Mine')
+        self.client.get(TAGS_URL)
+
+        other_client = APIClient()
+        other_client.force_authenticate(other)
+        res = other_client.get(TAGS_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['name'], 'Theirs')
+
+    def test_stats_require_admin(self):
+        """Test cache counters are limited to staff users"""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, 403)
+
+    def test_stats_count_hits_and_misses(self):
+        """Test cache counters reflect requests served"""
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data, {'hits': 1, 'misses': 1})
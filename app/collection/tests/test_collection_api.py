@@ -3,16 +3,22 @@ Test for collection API
 """
 import tempfile
 import os
+from io import StringIO
+from unittest.mock import patch
 
 from PIL import Image
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core import images
 from core.models import (
     Collection,
     Tag,
@@ -66,7 +72,7 @@ class PublicCollectionAPITests(TestCase):
         """Test authentication required for API call"""
         res = self.client.get(COLLECTION_URL)
 
-        self.assertEqual(res.status_code, 403)
+        self.assertEqual(res.status_code, 401)
 
 
 class PrivateCollectionAPITests(TestCase):
@@ -87,7 +93,7 @@ class PrivateCollectionAPITests(TestCase):
         collection = Collection.objects.all().order_by("-id")
         serializer = CollectionSerializer(collection, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_collection_list_for_user(self):
         """Test collections limited to authenticated user"""
@@ -100,7 +106,7 @@ class PrivateCollectionAPITests(TestCase):
         collection = Collection.objects.filter(user=self.user)
         serializer = CollectionSerializer(collection, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_collection_detail(self):
         """Test getting collection details"""
@@ -363,6 +369,35 @@ class PrivateCollectionAPITests(TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(collection.garments.count(), 0)
 
+    def test_create_collection_duplicate_names(self):
+        """Test repeated names in a payload create one object"""
+        payload = {
+            "title": "Layers",
+            "tags": [{"name": "Warm"}, {"name": "Warm"}],
+            "garments": [{"name": "Scarf"}, {"name": "Scarf"}],
+        }
+        res = self.client.post(COLLECTION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Garment.objects.filter(user=self.user).count(), 1)
+
+    def test_update_tags_and_garments_together(self):
+        """Test updating tags and garments in one request sets both"""
+        collection = create_collection(user=self.user)
+
+        payload = {
+            "tags": [{"name": "Summer"}],
+            "garments": [{"name": "Hat"}],
+        }
+        res = self.client.patch(
+            detail_url(collection.id), payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(collection.tags.get().name, "Summer")
+        self.assertEqual(collection.garments.get().name, "Hat")
+
     def test_filter_tags(self):
         """Test filtering collections by tags"""
         c1 = create_collection(user=self.user, title="Summer")
@@ -379,9 +414,9 @@ class PrivateCollectionAPITests(TestCase):
         s1 = CollectionSerializer(c1)
         s2 = CollectionSerializer(c2)
         s3 = CollectionSerializer(c3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_ingredients(self):
         """Test filtering collections by garments"""
@@ -399,9 +434,243 @@ class PrivateCollectionAPITests(TestCase):
         s1 = CollectionSerializer(c1)
         s2 = CollectionSerializer(c2)
         s3 = CollectionSerializer(c3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
+
+    def test_filter_tags_no_duplicates(self):
+        """Test collections matching several tags are listed once"""
+        c1 = create_collection(user=self.user, title='Summer')
+        tag1 = Tag.objects.create(user=self.user, name='Beach')
+        tag2 = Tag.objects.create(user=self.user, name='Rainy')
+        c1.tags.add(tag1, tag2)
+
+        res = self.client.get(COLLECTION_URL, {'tags': f'{tag1.id},{tag2.id}'})
+
+        self.assertEqual([c['id'] for c in res.data['results']], [c1.id])
+
+    def test_filter_match_all(self):
+        """Test requiring every listed tag and garment"""
+        c1 = create_collection(user=self.user, title='Summer')
+        c2 = create_collection(user=self.user, title='Spring')
+        tag1 = Tag.objects.create(user=self.user, name='Beach')
+        tag2 = Tag.objects.create(user=self.user, name='Rainy')
+        garment = Garment.objects.create(user=self.user, name='Shorts')
+        c1.tags.add(tag1, tag2)
+        c1.garments.add(garment)
+        c2.tags.add(tag1)
+        c2.garments.add(garment)
+
+        params = {'tags': f'{tag1.id},{tag2.id}', 'match': 'all'}
+        res = self.client.get(COLLECTION_URL, params)
+        self.assertEqual([c['id'] for c in res.data['results']], [c1.id])
+
+        params = {'garments': f'{garment.id}', 'match': 'all'}
+        res = self.client.get(COLLECTION_URL, params)
+        self.assertEqual(
+            [c['id'] for c in res.data['results']],
+            [c2.id, c1.id],
+        )
+
+    def test_filter_exclude(self):
+        """Test excluding collections by tags and garments"""
+        c1 = create_collection(user=self.user, title='Summer')
+        c2 = create_collection(user=self.user, title='Spring')
+        c3 = create_collection(user=self.user, title='Fall')
+        tag = Tag.objects.create(user=self.user, name='Rainy')
+        garment = Garment.objects.create(user=self.user, name='Coat')
+        c1.tags.add(tag)
+        c2.garments.add(garment)
+
+        params = {'exclude_tags': f'{tag.id}'}
+        res = self.client.get(COLLECTION_URL, params)
+        self.assertEqual(
+            [c['id'] for c in res.data['results']],
+            [c3.id, c2.id],
+        )
+
+        params = {'exclude_tags': f'{tag.id}', 'exclude_garments': garment.id}
+        res = self.client.get(COLLECTION_URL, params)
+        self.assertEqual([c['id'] for c in res.data['results']], [c3.id])
+
+    def test_filter_invalid_match(self):
+        """Test an unknown match mode is rejected"""
+        res = self.client.get(COLLECTION_URL, {'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SparseFieldsTests(TestCase):
+    """Test selecting fields and expanding relations"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="test123")
+        self.client.force_authenticate(self.user)
+        self.collection = create_collection(user=self.user, title="Summer")
+        self.tag = Tag.objects.create(user=self.user, name="Beach")
+        self.garment = Garment.objects.create(user=self.user, name="Shorts")
+        self.collection.tags.add(self.tag)
+        self.collection.garments.add(self.garment)
+
+    def test_relations_as_ids(self):
+        """Test unexpanded relations are returned as id lists"""
+        res = self.client.get(detail_url(self.collection.id))
+
+        self.assertEqual(res.data["tags"], [self.tag.id])
+        self.assertEqual(res.data["garments"], [self.garment.id])
+
+    def test_relations_as_ids_without_arrays(self):
+        """Test id lists are prefetched where arrays are unsupported"""
+        with patch(
+            "collection.filters.has_related_ids",
+            return_value=False,
+        ), CaptureQueriesContext(connection) as queries:
+            res = self.client.get(COLLECTION_URL)
+
+        collection = res.data["results"][0]
+        self.assertEqual(collection["tags"], [self.tag.id])
+        self.assertEqual(collection["garments"], [self.garment.id])
+        self.assertFalse(any(
+            "ARRAY" in query["sql"] for query in queries.captured_queries
+        ))
+
+    def test_expand(self):
+        """Test expanded relations are nested objects"""
+        res = self.client.get(COLLECTION_URL, {"expand": "tags"})
+
+        collection = res.data["results"][0]
+        self.assertEqual(
+            collection["tags"],
+            [{"id": self.tag.id, "name": "Beach", "collection_count": 1}],
+        )
+        self.assertEqual(collection["garments"], [self.garment.id])
+
+    def test_fields(self):
+        """Test only the requested fields are loaded and returned"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(COLLECTION_URL, {"fields": "id,title"})
+
+        self.assertEqual(
+            res.data["results"],
+            [{"id": self.collection.id, "title": "Summer"}],
+        )
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn('"link"', sql)
+        self.assertNotIn("ARRAY", sql)
+
+    def test_omit(self):
+        """Test omitted fields are left out"""
+        params = {"omit": "description,garments"}
+        res = self.client.get(detail_url(self.collection.id), params)
+
+        self.assertEqual(
+            set(res.data),
+            {"id", "title", "link", "tags", "tag_count", "garment_count"},
+        )
+
+
+class CollectionQueryCountTests(TestCase):
+    """Test collection endpoints run a fixed number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="test123")
+        self.client.force_authenticate(self.user)
+
+    def _add_collections(self, count):
+        """Create collections each with their own tags and garments"""
+        for i in range(count):
+            collection = create_collection(user=self.user, title=f"C{i}")
+            collection.tags.add(
+                Tag.objects.create(user=self.user, name=f"Tag{collection.id}")
+            )
+            collection.garments.add(
+                Garment.objects.create(user=self.user, name=f"Garment{i}")
+            )
+
+    def assertQueryCountStable(self, url, expected, sizes=(1, 5, 20)):
+        """Assert a GET on url runs `expected` queries for every size"""
+        for size in sizes:
+            with self.captureOnCommitCallbacks(execute=True):
+                self._add_collections(size)
+            with self.assertNumQueries(expected):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_query_count(self):
+        """Test listing collections does not query per collection"""
+        self.assertQueryCountStable(COLLECTION_URL, 2)
+
+    def test_list_expanded_query_count(self):
+        """Test expanded relations are prefetched in bulk"""
+        url = f"{COLLECTION_URL}?expand=tags,garments"
+        self.assertQueryCountStable(url, 4)
+
+    def test_detail_query_count(self):
+        """Test collection detail loads relations in bulk"""
+        self._add_collections(1)
+        collection = Collection.objects.get(user=self.user)
+        for i in range(10):
+            collection.tags.add(
+                Tag.objects.create(user=self.user, name=f"Extra{i}")
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(detail_url(collection.id))
+        self.assertEqual(len(res.data["tags"]), 11)
+
+        with self.assertNumQueries(4):
+            res = self.client.get(
+                detail_url(collection.id),
+                {"expand": "tags,garments"},
+            )
+        self.assertEqual(len(res.data["tags"]), 11)
+        self.assertIn("name", res.data["tags"][0])
+
+
+class CollectionUpsertQueryCountTests(TestCase):
+    """Test nested tag and garment writes are batched"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email="user@example.com", password="test123")
+        self.client.force_authenticate(self.user)
+
+    def _payload(self, size, prefix):
+        """Return a collection payload with size tags and garments"""
+        return {
+            "title": "Wardrobe",
+            "tags": [{"name": f"{prefix}Tag{i}"} for i in range(size)],
+            "garments": [
+                {"name": f"{prefix}Garment{i}"} for i in range(size)
+            ],
+        }
+
+    def _count_queries(self, payload):
+        """Return the number of queries used to create a collection"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(COLLECTION_URL, payload, format="json")
+        self.assertEqual(res.status_code, 201)
+
+        return len(queries)
+
+    def test_create_query_count_independent_of_size(self):
+        """Test creating many new tags and garments is set based"""
+        small = self._count_queries(self._payload(1, "a"))
+        large = self._count_queries(self._payload(50, "b"))
+
+        self.assertEqual(small, large)
+
+    def test_existing_names_reused(self):
+        """Test existing tags are linked without creating new rows"""
+        Tag.objects.bulk_create(
+            [Tag(user=self.user, name=f"aTag{i}") for i in range(50)]
+        )
+
+        self._count_queries(self._payload(50, "a"))
+
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 50)
 
 
 class ImageUploadTests(TestCase):
@@ -429,8 +698,25 @@ class ImageUploadTests(TestCase):
         self.collection.refresh_from_db()
         self.assertEqual(res.status_code, 200)
         self.assertIn('image', res.data)
+        self.assertEqual(res.data['image_status'], 'pending')
+        self.assertIsNone(res.data['image_variants'])
         self.assertTrue(os.path.exists(self.collection.image.path))
 
+    def test_upload_queues_variants(self):
+        """Test the worker generates variants after an upload"""
+        url = image_upload_url(self.collection.id)
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            img = Image.new('RGB', (10, 10))
+            img.save(image_file, format='JPEG')
+            image_file.seek(0)
+            self.client.post(url, {'image': image_file}, format='multipart')
+
+        call_command('run_image_worker', '--burst', stdout=StringIO())
+
+        self.collection.refresh_from_db()
+        self.assertEqual(self.collection.image_status, 'ready')
+        self.assertTrue(images.has_variants(self.collection.image))
+
     def test_upload_image_bad_request(self):
         """Test uploading invalid image"""
         url = image_upload_url(self.collection.id)
@@ -440,4 +726,6 @@ class ImageUploadTests(TestCase):
         self.assertEqual(res.status_code, 400)
 
     def tearDown(self):
+        if self.collection.image:
+            images.delete_variants(self.collection.image)
         self.collection.image.delete()
@@ -0,0 +1,147 @@
+"""
+Tests for conditional GET on the collection API
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Garment,
+    Tag,
+)
+
+
+COLLECTION_URL = reverse("collection:collection-list")
+GARMENTS_URL = reverse("collection:garment-list")
+
+
+def detail_url(collection_id):
+    """Create and return collection details URL"""
+    return reverse("collection:collection-detail", args=[collection_id])
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.collection = Collection.objects.create(
+            user=self.user,
+            title='Summer',
+        )
+
+    def test_validators_returned(self):
+        """Test details carry ETag and Last-Modified, lists only ETag"""
+        res = self.client.get(detail_url(self.collection.id))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('ETag', res)
+        self.assertIn('Last-Modified', res)
+
+        res = self.client.get(COLLECTION_URL)
+
+        self.assertIn('ETag', res)
+        self.assertNotIn('Last-Modified', res)
+
+    def test_matching_etag_not_modified(self):
+        """Test a matching If-None-Match returns 304 in one query"""
+        etag = self.client.get(COLLECTION_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(COLLECTION_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+
+    def test_if_modified_since_not_modified(self):
+        """Test an unchanged detail returns 304 for If-Modified-Since"""
+        url = detail_url(self.collection.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_update_changes_etag(self):
+        """Test editing a collection invalidates its ETag"""
+        url = detail_url(self.collection.id)
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {'title': 'Winter'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['title'], 'Winter')
+
+    def test_delete_changes_list_etag(self):
+        """Test removing a collection invalidates the list ETag"""
+        Collection.objects.create(user=self.user, title='Winter')
+        etag = self.client.get(COLLECTION_URL)['ETag']
+
+        self.collection.delete()
+        res = self.client.get(COLLECTION_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_delete_then_if_modified_since(self):
+        """Test a list is not reported unmodified after a delete"""
+        winter = Collection.objects.create(user=self.user, title='Winter')
+        detail = self.client.get(detail_url(self.collection.id))
+
+        winter.delete()
+        res = self.client.get(
+            COLLECTION_URL,
+            HTTP_IF_MODIFIED_SINCE=detail['Last-Modified'],
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_relation_change_changes_etag(self):
+        """Test renaming an embedded tag invalidates the collection ETag"""
+        tag = Tag.objects.create(user=self.user, name='Beach')
+        self.collection.tags.add(tag)
+        url = detail_url(self.collection.id)
+        etag = self.client.get(url, {'expand': 'tags'})['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.name = 'Pool'
+            tag.save()
+        res = self.client.get(
+            url,
+            {'expand': 'tags'},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['tags'][0]['name'], 'Pool')
+
+    def test_assignment_changes_garment_etag(self):
+        """Test assigning a garment invalidates assigned_only lists"""
+        garment = Garment.objects.create(user=self.user, name='Hat')
+        params = {'assigned_only': 1}
+        etag = self.client.get(GARMENTS_URL, params)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.collection.garments.add(garment)
+        res = self.client.get(
+            GARMENTS_URL,
+            params,
+            HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data['results']), 1)
@@ -0,0 +1,159 @@
+"""
+Tests for the wardrobe export endpoint
+"""
+import csv
+import io
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Garment,
+    Tag,
+)
+from collection import export
+
+
+EXPORT_URL = reverse("collection:export")
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+def read_content(res):
+    """Return the streamed body of a response as text"""
+    return b"".join(res.streaming_content).decode()
+
+
+class PublicExportAPITests(TestCase):
+    """Test unauthenticated export requests"""
+
+    def test_auth_required(self):
+        """Test auth is required to export"""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(ASYNC_VIEWS=False)
+class PrivateExportAPITests(TestCase):
+    """Test exporting a user's wardrobe"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.tag = Tag.objects.create(user=self.user, name="Summer")
+        self.garment = Garment.objects.create(user=self.user, name="Shirt")
+        self.collection = Collection.objects.create(
+            user=self.user,
+            title="Beach",
+            link="https://example.com",
+        )
+        self.collection.tags.add(self.tag)
+        self.collection.garments.add(self.garment)
+        Collection.objects.create(user=self.user, title="Empty")
+
+        other = create_user(email="other@example.com")
+        Tag.objects.create(user=other, name="Winter")
+        Collection.objects.create(user=other, title="Other")
+
+    def test_export_ndjson(self):
+        """Test exporting records as newline delimited JSON"""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in read_content(res).splitlines()]
+        self.assertEqual(
+            [record["type"] for record in records],
+            ["tag", "garment", "collection", "collection"],
+        )
+        self.assertEqual(records[0], {
+            "type": "tag",
+            "id": self.tag.id,
+            "name": "Summer",
+        })
+        self.assertEqual(records[2]["tags"], [self.tag.id])
+        self.assertEqual(records[2]["garments"], [self.garment.id])
+        self.assertEqual(records[3]["tags"], [])
+
+    def test_export_csv(self):
+        """Test exporting records as CSV"""
+        res = self.client.get(EXPORT_URL, {"type": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(read_content(res))))
+        self.assertEqual(len(rows), 4)
+        collection = rows[2]
+        self.assertEqual(collection["title"], "Beach")
+        self.assertEqual(collection["tags"], str(self.tag.id))
+        self.assertEqual(collection["garments"], str(self.garment.id))
+        self.assertEqual(rows[0]["title"], "")
+
+    def test_export_invalid_type(self):
+        """Test an unknown export format is rejected"""
+        res = self.client.get(EXPORT_URL, {"type": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_export_async_stream(self):
+        """Test the export streams from an async iterator under ASGI"""
+        res = await sync_to_async(self.client.get)(EXPORT_URL, {"type": "csv"})
+
+        self.assertTrue(res.is_async)
+        content = b"".join([chunk async for chunk in res.streaming_content])
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(
+            [row["type"] for row in rows],
+            ["tag", "garment", "collection", "collection"],
+        )
+        self.assertEqual(rows[2]["garments"], str(self.garment.id))
+
+    def test_export_reads_in_transaction(self):
+        """Test rows are read in a transaction ended with the response
+
+        Cursors opened in autocommit are declared WITH HOLD, which makes
+        Postgres build the whole result before the first row is sent.
+        """
+        depth = len(connection.atomic_blocks)
+        res = self.client.get(EXPORT_URL)
+
+        with patch.object(export, "BUFFER_SIZE", 1):
+            next(iter(res.streaming_content))
+        self.assertEqual(len(connection.atomic_blocks), depth + 1)
+
+        res.close()
+        self.assertEqual(len(connection.atomic_blocks), depth)
+
+    async def test_async_export_reads_in_transaction(self):
+        """Test async exports read in a transaction ended on close"""
+        def depth():
+            return len(connection.atomic_blocks)
+
+        start = await sync_to_async(depth)()
+        records = export.aexport_records(self.user)
+
+        await anext(records)
+        self.assertEqual(await sync_to_async(depth)(), start + 1)
+
+        await records.aclose()
+        self.assertEqual(await sync_to_async(depth)(), start)
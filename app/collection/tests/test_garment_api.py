@@ -3,15 +3,20 @@ Test for the garments API
 """
 import tempfile
 import os
+from io import StringIO
 
 from PIL import Image
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.test import TestCase
 
 from rest_framework.test import APIClient
 
+from core import images
 from core.models import (
     Garment,
     Collection,
@@ -80,7 +85,7 @@ class PrivateGarmentAPITest(TestCase):
         garments = Garment.objects.all().order_by("-name")
         serializer = GarmentSerializer(garments, many=True)
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_garment_limited_to_user(self):
         """Test list of garments is limited to authenticate user"""
@@ -91,9 +96,9 @@ class PrivateGarmentAPITest(TestCase):
         res = self.client.get(GARMENTS_URL)
 
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], garment.name)
-        self.assertEqual(res.data[0]['id'], garment.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], garment.name)
+        self.assertEqual(res.data['results'][0]['id'], garment.id)
 
     def test_update_garment(self):
         """Test updating a garment"""
@@ -144,8 +149,25 @@ class ImageUploadTests(TestCase):
         self.garment.refresh_from_db()
         self.assertEqual(res.status_code, 200)
         self.assertIn("image", res.data)
+        self.assertEqual(res.data["image_status"], "pending")
+        self.assertIsNone(res.data["image_variants"])
         self.assertTrue(os.path.exists(self.garment.image.path))
 
+    def test_upload_queues_variants(self):
+        """Test the worker generates variants after an upload"""
+        url = image_upload_url(self.garment.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
+            img = Image.new("RGB", (10, 10))
+            img.save(image_file, format="JPEG")
+            image_file.seek(0)
+            self.client.post(url, {"image": image_file}, format="multipart")
+
+        call_command("run_image_worker", "--burst", stdout=StringIO())
+
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.image_status, "ready")
+        self.assertTrue(images.has_variants(self.garment.image))
+
     def test_upload_image_bad_request(self):
         """Test uploading invalid image"""
         url = image_upload_url(self.garment.id)
@@ -155,6 +177,8 @@ class ImageUploadTests(TestCase):
         self.assertEqual(res.status_code, 400)
 
     def tearDown(self):
+        if self.garment.image:
+            images.delete_variants(self.garment.image)
         self.garment.image.delete()
 
     def test_filter_garments_in_collections(self):
@@ -169,10 +193,11 @@ class ImageUploadTests(TestCase):
 
         res = self.client.get(GARMENTS_URL, {'assigned_only': 1})
 
+        gar1.refresh_from_db()
         s1 = GarmentSerializer(gar1)
         s2 = GarmentSerializer(gar2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_garments_unique(self):
         """Test filtered garments returns a unique list"""
@@ -191,4 +216,42 @@ class ImageUploadTests(TestCase):
 
         res = self.client.get(GARMENTS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_garments_unassigned(self):
+        """Test listing garments not assigned to any collection"""
+        gar1 = Garment.objects.create(user=self.user, name='Shirt')
+        gar2 = Garment.objects.create(user=self.user, name='Sweater')
+        collection = Collection.objects.create(
+            title='Tops',
+            user=self.user,
+        )
+        collection.garments.add(gar1)
+
+        res = self.client.get(GARMENTS_URL, {'unassigned_only': 1})
+
+        ids = [g['id'] for g in res.data['results']]
+        self.assertIn(gar2.id, ids)
+        self.assertNotIn(gar1.id, ids)
+
+    def test_filter_assigned_uses_exists(self):
+        """Test assignment filters do not join and de-duplicate rows"""
+        garment = Garment.objects.create(user=self.user, name='Shirt')
+        collections = Collection.objects.bulk_create(
+            Collection(title=f'Outfit {i}', user=self.user)
+            for i in range(200)
+        )
+        garment.collection_set.add(*collections)
+
+        for param in ('assigned_only', 'unassigned_only'):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(GARMENTS_URL, {param: 1})
+
+            self.assertEqual(res.status_code, 200)
+            sql = queries.captured_queries[-1]['sql']
+            self.assertIn('EXISTS', sql)
+            self.assertNotIn('DISTINCT', sql)
+            self.assertNotIn('JOIN', sql)
+
+        res = self.client.get(GARMENTS_URL, {'assigned_only': 1})
+        self.assertEqual([g['id'] for g in res.data['results']], [garment.id])
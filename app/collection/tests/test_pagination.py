@@ -0,0 +1,120 @@
+"""
+Tests for keyset pagination of the collection API
+"""
+import base64
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Garment,
+)
+
+
+COLLECTION_URL = reverse("collection:collection-list")
+GARMENTS_URL = reverse("collection:garment-list")
+
+
+def make_cursor(reverse, position):
+    """Encode a cursor the way the paginator does"""
+    payload = json.dumps([reverse, position]).encode()
+
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class KeysetPaginationTests(TestCase):
+    """Test paging through list endpoints with cursors"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _collect_pages(self, url, params):
+        """Follow next links and return ids of every page"""
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, 200)
+            pages.append([item['id'] for item in res.data['results']])
+            if not res.data['next']:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_collections_paged_by_id(self):
+        """Test collection pages follow descending id order"""
+        ids = [
+            Collection.objects.create(user=self.user, title=f'C{i}').id
+            for i in range(5)
+        ]
+
+        pages = self._collect_pages(COLLECTION_URL, {'page_size': 2})
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), sorted(ids, reverse=True))
+
+    def test_garments_with_duplicate_names_paged(self):
+        """Test rows sharing a name are neither skipped nor repeated"""
+        for name in ['Shirt', 'Socks', 'Socks', 'Socks', 'Vest']:
+            Garment.objects.create(user=self.user, name=name)
+
+        pages = self._collect_pages(GARMENTS_URL, {'page_size': 2})
+
+        expected = Garment.objects.order_by('-name', '-id')
+        self.assertEqual(sum(pages, []), [garment.id for garment in expected])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous cursor returns the page before"""
+        for i in range(5):
+            Collection.objects.create(user=self.user, title=f'C{i}')
+
+        first = self.client.get(COLLECTION_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    @patch('collection.pagination.KeysetPagination.max_page_size', 2)
+    def test_page_size_capped(self):
+        """Test a page size above the maximum is clamped"""
+        for i in range(3):
+            Collection.objects.create(user=self.user, title=f'C{i}')
+
+        res = self.client.get(COLLECTION_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor returns not found"""
+        res = self.client.get(COLLECTION_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_cursor_with_invalid_values(self):
+        """Test cursor values of the wrong type return not found"""
+        cases = [
+            (COLLECTION_URL, ['x']),
+            (COLLECTION_URL, [None]),
+            (COLLECTION_URL, [[1]]),
+            (GARMENTS_URL, ['Shirt', 'x']),
+        ]
+        for url, position in cases:
+            with self.subTest(url=url, position=position):
+                res = self.client.get(
+                    url,
+                    {'cursor': make_cursor(False, position)},
+                )
+
+                self.assertEqual(res.status_code, 404)
@@ -0,0 +1,131 @@
+"""
+Tests for full-text search of collections
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Collection,
+    Garment,
+)
+
+
+COLLECTION_URL = reverse("collection:collection-list")
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return user"""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class CollectionSearchTests(TestCase):
+    """Test the q search parameter"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, terms, **params):
+        """Return the ids of collections matching the terms"""
+        res = self.client.get(COLLECTION_URL, {"q": terms, **params})
+        self.assertEqual(res.status_code, 200)
+
+        return [item["id"] for item in res.data["results"]]
+
+    def test_search_title_and_description(self):
+        """Test searching words of titles and descriptions"""
+        beach = Collection.objects.create(
+            user=self.user,
+            title="Beach holiday",
+        )
+        office = Collection.objects.create(
+            user=self.user,
+            title="Office",
+            description="Outfits for meetings",
+        )
+        other = create_user(email="other@example.com")
+        Collection.objects.create(user=other, title="Beach party")
+
+        self.assertEqual(self.search("beach"), [beach.id])
+        self.assertEqual(self.search("meeting"), [office.id])
+        self.assertEqual(self.search("ski"), [])
+
+    def test_search_garment_names(self):
+        """Test searching names of garments and keeping them in sync"""
+        collection = Collection.objects.create(user=self.user, title="Work")
+        garment = Garment.objects.create(user=self.user, name="Blazer")
+        collection.garments.add(garment)
+
+        self.assertEqual(self.search("blazer"), [collection.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            garment.name = "Cardigan"
+            garment.save()
+        self.assertEqual(self.search("blazer"), [])
+        self.assertEqual(self.search("cardigan"), [collection.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            garment.delete()
+        self.assertEqual(self.search("cardigan"), [])
+
+    def test_search_bulk_rename(self):
+        """Test bulk garment updates refresh the search vectors"""
+        collection = Collection.objects.create(user=self.user, title="Work")
+        garment = Garment.objects.create(user=self.user, name="Blazer")
+        collection.garments.add(garment)
+
+        self.client.patch(
+            reverse("collection:garment-bulk"),
+            [{"id": garment.id, "name": "Cardigan"}],
+            format="json",
+        )
+
+        self.assertEqual(self.search("cardigan"), [collection.id])
+
+    def test_search_ranking(self):
+        """Test title matches rank above description matches"""
+        described = Collection.objects.create(
+            user=self.user,
+            title="Office",
+            description="Linen shirts",
+        )
+        titled = Collection.objects.create(user=self.user, title="Linen")
+
+        self.assertEqual(self.search("linen"), [titled.id, described.id])
+
+    def test_search_pagination(self):
+        """Test paging through ranked results"""
+        ids = {
+            Collection.objects.create(user=self.user, title=f"Summer {i}").id
+            for i in range(5)
+        }
+
+        seen = []
+        res = self.client.get(COLLECTION_URL, {"q": "summer", "page_size": 2})
+        while True:
+            seen.extend(item["id"] for item in res.data["results"])
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(set(seen), ids)
+
+    @patch("core.search.is_supported", return_value=False)
+    def test_search_fallback(self, patched_supported):
+        """Test substring search without native full-text support"""
+        collection = Collection.objects.create(user=self.user, title="Work")
+        garment = Garment.objects.create(user=self.user, name="Blazer")
+        collection.garments.add(garment)
+        Collection.objects.create(user=self.user, title="Beach")
+
+        self.assertEqual(self.search("blaz work"), [collection.id])
+        self.assertEqual(self.search("blazer beach"), [])
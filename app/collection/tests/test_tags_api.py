@@ -1,7 +1,10 @@
 """
 Tests for the tags API
 """
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.test import TestCase
 
@@ -59,7 +62,7 @@ class PrivateTagsAPITests(TestCase):
         tags = Tag.objects.all().order_by("-name")
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test list of tags are limited to authenticated user"""
@@ -70,9 +73,18 @@ class PrivateTagsAPITests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
-        self.assertEqual(res.data[0]['id'], tag.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
+        self.assertEqual(res.data['results'][0]['id'], tag.id)
+
+    def test_get_tag_detail(self):
+        """Test retrieving a single tag"""
+        tag = Tag.objects.create(user=self.user, name='Spring')
+
+        res = self.client.get(detail_url(tag.id))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data, TagSerializer(tag).data)
 
     def test_updated_tag(self):
         """Test updating a tag"""
@@ -86,6 +98,30 @@ class PrivateTagsAPITests(TestCase):
         tag.refresh_from_db()
         self.assertEqual(tag.name, payload['name'])
 
+    def test_update_tag_duplicate_name(self):
+        """Test renaming a tag to an existing name returns an error"""
+        Tag.objects.create(user=self.user, name='Fall')
+        tag = Tag.objects.create(user=self.user, name='Autumn')
+
+        res = self.client.patch(detail_url(tag.id), {'name': 'Fall'})
+
+        self.assertEqual(res.status_code, 400)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Autumn')
+
+    def test_update_tag_concurrent_duplicate(self):
+        """Test a rename racing another to the same name returns an error"""
+        Tag.objects.create(user=self.user, name='Fall')
+        tag = Tag.objects.create(user=self.user, name='Autumn')
+
+        with patch.object(QuerySet, 'exists', return_value=False):
+            res = self.client.patch(detail_url(tag.id), {'name': 'Fall'})
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('name', res.data)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Autumn')
+
     def test_delete_tag(self):
         """Test the deletion of tags"""
         tag = Tag.objects.create(user=self.user, name='Spring')
@@ -109,10 +145,11 @@ class PrivateTagsAPITests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
+        tag1.refresh_from_db()
         s1 = TagSerializer(tag1)
         s2 = TagSerializer(tag2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_tags_unique(self):
         """Test filtered tags returns a unique list"""
@@ -131,4 +168,25 @@ class PrivateTagsAPITests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_tags_unassigned(self):
+        """Test listing tags not assigned to any collection"""
+        tag1 = Tag.objects.create(user=self.user, name='Summer')
+        tag2 = Tag.objects.create(user=self.user, name='Spring')
+        collection = Collection.objects.create(
+            title='Seasonal',
+            user=self.user,
+        )
+        collection.tags.add(tag1)
+
+        res = self.client.get(TAGS_URL, {'unassigned_only': 1})
+
+        self.assertEqual([t['id'] for t in res.data['results']], [tag2.id])
+
+    def test_filter_tags_assigned_and_unassigned(self):
+        """Test the assigned and unassigned filters are exclusive"""
+        params = {'assigned_only': 1, 'unassigned_only': 1}
+        res = self.client.get(TAGS_URL, params)
+
+        self.assertEqual(res.status_code, 400)
@@ -0,0 +1,184 @@
+"""
+Tests for the resumable upload API
+"""
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    Garment,
+    ImageJob,
+    UploadSession,
+)
+
+
+UPLOADS_URL = reverse("collection:uploadsession-list")
+UPLOAD_ROOT = tempfile.mkdtemp()
+
+
+def chunk_url(session_id, index):
+    """Create and return the URL of a chunk"""
+    return reverse(
+        "collection:uploadsession-chunk",
+        args=[session_id, index],
+    )
+
+
+def finalize_url(session_id):
+    """Create and return the finalize URL of a session"""
+    return reverse("collection:uploadsession-finalize", args=[session_id])
+
+
+def sample_jpeg():
+    """Return the bytes of a small JPEG"""
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), color="blue").save(buffer, format="JPEG")
+
+    return buffer.getvalue()
+
+
+@override_settings(
+    CHUNKED_UPLOAD_ROOT=UPLOAD_ROOT,
+    CHUNKED_UPLOAD_CHUNK_SIZE=256,
+)
+class ChunkedUploadTests(TestCase):
+    """Test uploading an image in chunks"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(UPLOAD_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "user@example.com",
+            "testpass123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.garment = Garment.objects.create(user=self.user, name="Coat")
+        self.data = sample_jpeg()
+
+    def tearDown(self):
+        self.garment.refresh_from_db()
+        if self.garment.image:
+            self.garment.image.delete()
+
+    def _start(self, checksum=None):
+        """Create an upload session for the sample image"""
+        payload = {
+            "target": "garment",
+            "object_id": self.garment.id,
+            "filename": "coat.jpg",
+            "size": len(self.data),
+            "checksum": checksum or hashlib.sha256(self.data).hexdigest(),
+        }
+        res = self.client.post(UPLOADS_URL, payload)
+        self.assertEqual(res.status_code, 201)
+
+        return res.data
+
+    def _send(self, session, index):
+        """Send one chunk of the sample image"""
+        size = session["chunk_size"]
+        return self.client.put(
+            chunk_url(session["id"], index),
+            self.data[index * size:(index + 1) * size],
+            content_type="application/octet-stream",
+        )
+
+    def test_upload_in_chunks(self):
+        """Test chunks out of order are assembled and attached"""
+        session = self._start()
+        for index in reversed(range(session["total_chunks"])):
+            res = self._send(session, index)
+            self.assertEqual(res.status_code, 200)
+
+        res = self.client.post(finalize_url(session["id"]))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["image_status"], "pending")
+        self.garment.refresh_from_db()
+        with self.garment.image.open("rb") as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertTrue(ImageJob.objects.exists())
+        self.assertEqual(
+            UploadSession.objects.get().status,
+            UploadSession.Status.COMPLETE,
+        )
+
+    def test_resume_reports_received_chunks(self):
+        """Test the session lists chunks already stored"""
+        session = self._start()
+        self._send(session, 0)
+        self._send(session, 2)
+
+        res = self.client.get(
+            reverse("collection:uploadsession-detail", args=[session["id"]])
+        )
+
+        self.assertEqual(res.data["received_chunks"], [0, 2])
+
+    def test_finalize_missing_chunks(self):
+        """Test finalizing before every chunk arrives fails"""
+        session = self._start()
+        self._send(session, 0)
+
+        res = self.client.post(finalize_url(session["id"]))
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_finalize_checksum_mismatch(self):
+        """Test data not matching the checksum is rejected"""
+        session = self._start(checksum="0" * 64)
+        for index in range(session["total_chunks"]):
+            self._send(session, index)
+
+        res = self.client.post(finalize_url(session["id"]))
+
+        self.assertEqual(res.status_code, 400)
+        self.garment.refresh_from_db()
+        self.assertFalse(self.garment.image)
+
+    def test_chunk_wrong_size(self):
+        """Test a chunk with the wrong length is rejected"""
+        session = self._start()
+
+        res = self.client.put(
+            chunk_url(session["id"], 0),
+            b"short",
+            content_type="application/octet-stream",
+        )
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_other_users_object_rejected(self):
+        """Test sessions cannot target another user's garment"""
+        other = get_user_model().objects.create_user(
+            "other@example.com",
+            "testpass123",
+        )
+        garment = Garment.objects.create(user=other, name="Hat")
+        payload = {
+            "target": "garment",
+            "object_id": garment.id,
+            "filename": "hat.jpg",
+            "size": 10,
+            "checksum": "0" * 64,
+        }
+
+        res = self.client.post(UPLOADS_URL, payload)
+
+        self.assertEqual(res.status_code, 400)
@@ -15,9 +15,12 @@ router = DefaultRouter()
 router.register('collections', views.CollectionViewSet)
 router.register('tags', views.TagViewSet)
 router.register('garments', views.GarmentViewSet)
+router.register('uploads', views.UploadSessionViewSet)
 
 app_name = 'collection'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('export/', views.ExportView.as_view(), name='export'),
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -1,6 +1,15 @@
 """
 Views for collections API
 """
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import (
+    Http404,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -12,17 +21,62 @@ from rest_framework import (
     mixins,
     status,
 )
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import (
+    IsAdminUser,
+    IsAuthenticated,
+)
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core import (
+    search,
+    uploads,
+)
+from core.asyncviews import AsyncReadMixin
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from core.models import (
     Collection,
     Tag,
     Garment,
+    UploadSession,
+)
+from collection import (
+    export,
+    filters,
+    serializers,
 )
-from collection import serializers
+from collection.autocomplete import AutocompleteMixin
+from collection.bulk import BulkWriteMixin
+from collection.conditional import ConditionalGetMixin
+from collection.cache import (
+    CachedResponseMixin,
+    get_stats,
+)
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to include',
+    ),
+    OpenApiParameter(
+        'omit',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to leave out',
+    ),
+    OpenApiParameter(
+        'expand',
+        OpenApiTypes.STR,
+        description='Comma separated relations (tags, garments) to nest '
+                    'as objects instead of id lists',
+    ),
+]
 
 
 @extend_schema_view(
@@ -37,16 +91,50 @@ from collection import serializers
                 'garments',
                 OpenApiTypes.STR,
                 description='Comma separated list of garment ids to filter',
-            )
+            ),
+            OpenApiParameter(
+                'match',
+                OpenApiTypes.STR,
+                enum=list(filters.MATCH_MODES),
+                description='Require any (default) or all of the listed '
+                            'tags and garments',
+            ),
+            OpenApiParameter(
+                'exclude_tags',
+                OpenApiTypes.STR,
+                description='Comma separated list of tag ids to exclude',
+            ),
+            OpenApiParameter(
+                'exclude_garments',
+                OpenApiTypes.STR,
+                description='Comma separated list of garment ids to exclude',
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                description='Search words in titles, descriptions and '
+                            'garment names, results ordered by relevance',
+            ),
         ]
-    )
+    ),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
 )
-class CollectionViewSet(viewsets.ModelViewSet):
+class CollectionViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """View to manage collection API"""
 
     serializer_class = serializers.CollectionDetailSerializer
     queryset = Collection.objects.all()
-    authentication_clases = [TokenAuthentication]
+    ordering = ('-id',)
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
 
     def _params_to_ints(self, qs):
@@ -55,19 +143,77 @@ class CollectionViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve collections for the authenitcated user"""
-        tags = self.request.query_params.get('tags')
-        garments = self.request.query_params.get('garments')
+        params = self.request.query_params
+        match = params.get('match', 'any')
+        if match not in filters.MATCH_MODES:
+            raise ValidationError({'match': [
+                f'Expected one of {", ".join(filters.MATCH_MODES)}.'
+            ]})
+
         queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if garments:
-            garment_ids = self._params_to_ints(garments)
-            queryset = queryset.filter(garments__id__in=garment_ids)
+        for field in ('tags', 'garments'):
+            ids = params.get(field)
+            exclude = params.get(f'exclude_{field}')
+            queryset = filters.filter_related(
+                queryset,
+                field,
+                ids=self._params_to_ints(ids) if ids else None,
+                exclude=self._params_to_ints(exclude) if exclude else None,
+                match=match,
+            )
+        terms = self.request.query_params.get('q', '').strip()
+        if terms and self.action == 'list':
+            queryset = search.search_collections(queryset, terms)
+            self.ordering = ('-rank', '-id')
 
-        return queryset.filter(
+        queryset = queryset.filter(
             user=self.request.user
-        ).order_by("-id").distinct()
+        ).order_by(*self.ordering)
+
+        return self._optimize_queryset(queryset)
+
+    def _optimize_queryset(self, queryset):
+        """Load only the columns and relations the response includes"""
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        params = self.request.query_params
+        serializer_class = self.get_serializer_class()
+        names = serializers.select_fields(
+            params,
+            serializer_class.Meta.fields,
+        )
+        expanded = serializers.expanded_fields(params)
+        relations = serializer_class.expandable_fields
+
+        queryset = queryset.only(
+            'id',
+            *[name for name in names if name not in relations],
+        )
+        for name in relations:
+            if name not in names:
+                continue
+            model = Collection._meta.get_field(name).related_model
+            if name in expanded:
+                queryset = queryset.prefetch_related(Prefetch(
+                    name,
+                    queryset=model.objects.only(
+                        'id',
+                        'name',
+                        'collection_count',
+                    ),
+                ))
+            elif filters.has_related_ids():
+                queryset = queryset.annotate(
+                    **{f'{name}_ids': filters.related_ids(name)}
+                )
+            else:
+                queryset = queryset.prefetch_related(Prefetch(
+                    name,
+                    queryset=model.objects.only('id'),
+                ))
+
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request"""
@@ -103,18 +249,34 @@ class CollectionViewSet(viewsets.ModelViewSet):
                 OpenApiTypes.INT,
                 enum=[0, 1],
                 description='Filter by items assigned to collections',
-            )
+            ),
+            OpenApiParameter(
+                'unassigned_only',
+                OpenApiTypes.INT,
+                enum=[0, 1],
+                description='Filter by items not assigned to collections',
+            ),
         ]
     )
 )
 class BaseCollectionAttrViewSet(
+    AutocompleteMixin,
+    BulkWriteMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    AsyncReadMixin,
     mixins.DestroyModelMixin,
     mixins.UpdateModelMixin,
+    mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
     """Base viewset for collection attributes"""
-    authentication_classes = [TokenAuthentication]
+    ordering = ('-name', '-id')
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -122,13 +284,23 @@ class BaseCollectionAttrViewSet(
         assigned_only = bool(
             int(self.request.query_params.get('assigned_only', 0))
         )
+        unassigned_only = bool(
+            int(self.request.query_params.get('unassigned_only', 0))
+        )
+        if assigned_only and unassigned_only:
+            raise ValidationError(
+                'assigned_only and unassigned_only are exclusive.'
+            )
+
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(collection__isnull=False)
+            queryset = filters.assigned(queryset, self.collection_field)
+        elif unassigned_only:
+            queryset = filters.unassigned(queryset, self.collection_field)
 
         return queryset.filter(
             user=self.request.user
-        ).order_by("-name").distinct()
+        ).order_by(*self.ordering)
 
 
 class TagViewSet(BaseCollectionAttrViewSet):
@@ -136,6 +308,8 @@ class TagViewSet(BaseCollectionAttrViewSet):
 
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    collection_field = 'tags'
+    unique_names = True
 
 
 class GarmentViewSet(BaseCollectionAttrViewSet):
@@ -143,6 +317,8 @@ class GarmentViewSet(BaseCollectionAttrViewSet):
 
     serializer_class = serializers.GarmentSerializer
     queryset = Garment.objects.all()
+    collection_field = 'garments'
+    search_indexed = True
 
     def get_serializer_class(self):
         if self.action == 'upload_image':
@@ -161,3 +337,154 @@ class GarmentViewSet(BaseCollectionAttrViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UploadSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Manage resumable chunked image uploads"""
+
+    serializer_class = serializers.UploadSessionSerializer
+    queryset = UploadSession.objects.all()
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Retrieve open upload sessions for the authenticated user"""
+        return self.queryset.filter(
+            user=self.request.user,
+            status=UploadSession.Status.OPEN,
+            expires_at__gt=timezone.now(),
+        )
+
+    def perform_create(self, serializer):
+        """Create a new upload session"""
+        serializer.save(user=self.request.user)
+
+    @extend_schema(
+        request={'application/octet-stream': OpenApiTypes.BINARY},
+        responses=serializers.UploadSessionSerializer,
+    )
+    @action(
+        methods=['PUT'],
+        detail=True,
+        url_path=r'chunks/(?P<index>[0-9]+)',
+    )
+    def chunk(self, request, pk=None, index=None):
+        """Stream one chunk from the request body to disk"""
+        session = self.get_object()
+        try:
+            stream = request.stream or BytesIO()
+            uploads.write_chunk(session, int(index), stream)
+        except uploads.ChunkError as exc:
+            return Response(
+                {'detail': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(self.get_serializer(session).data)
+
+    @extend_schema(request=None)
+    @action(methods=['POST'], detail=True)
+    def finalize(self, request, pk=None):
+        """Verify the assembled file and attach it to its target"""
+        session = self.get_object()
+        target = session.target
+        if target is None:
+            uploads.discard(session)
+            session.delete()
+            raise Http404
+
+        try:
+            upload = uploads.assemble(session)
+        except uploads.ChunkError as exc:
+            return Response(
+                {'detail': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer_class = {
+            Collection: serializers.CollectionImageSerializer,
+            Garment: serializers.GarmentImageSerializer,
+        }[type(target)]
+        with upload:
+            serializer = serializer_class(
+                target,
+                data={'image': upload},
+                context=self.get_serializer_context(),
+            )
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            serializer.save()
+
+        session.status = UploadSession.Status.COMPLETE
+        session.save(update_fields=['status'])
+        uploads.discard(session)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    """Report response cache hit and miss counters"""
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Return the cache counters"""
+        return Response(get_stats())
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            'type',
+            OpenApiTypes.STR,
+            enum=list(export.FORMATS),
+            description='Export format, ndjson (default) or csv',
+        ),
+    ],
+    responses={(200, 'application/x-ndjson'): OpenApiTypes.STR},
+)
+class ExportView(APIView):
+    """Stream every tag, garment and collection of the user"""
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Return the export as a streaming response"""
+        fmt = request.query_params.get('type', 'ndjson')
+        if fmt not in export.FORMATS:
+            return Response(
+                {'type': [f'Expected one of {", ".join(export.FORMATS)}.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lines, content_type, extension = export.FORMATS[fmt]
+        if settings.ASYNC_VIEWS:
+            # ASGI drains sync iterators before sending the first byte
+            content = export.aencode(
+                lines,
+                export.aexport_records(request.user),
+            )
+        else:
+            content = export.encode(lines, export.export_records(request.user))
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="wardrobe.{extension}"'
+        )
+
+        return response
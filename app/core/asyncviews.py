@@ -0,0 +1,147 @@
+"""
+Native async read paths for DRF views served under ASGI
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+
+READ_METHODS = ('get', 'head')
+
+
+class AsyncReadMixin:
+    """Serve list and retrieve as coroutines when ASYNC_VIEWS is set
+
+    GET and HEAD run `a<action>` methods without leaving the event loop,
+    other methods go to the regular DRF view in a worker thread. Mixins
+    that wrap list or retrieve provide matching async methods and must
+    come before this class.
+    """
+
+    async_read_action = 'retrieve'
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        view = super().as_view(*args, **initkwargs)
+        actions = args[0] if args else None
+        read = (
+            actions.get('get') if actions is not None
+            else cls.async_read_action
+        )
+        if not settings.ASYNC_VIEWS or read not in ('list', 'retrieve'):
+            return view
+
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method.lower() not in READ_METHODS:
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            if actions is not None:
+                self.action_map = {method: read for method in READ_METHODS}
+
+            return await self.adispatch(read, request, *args, **kwargs)
+
+        async_view.cls = cls
+        async_view.initkwargs = initkwargs
+        async_view.actions = actions
+
+        return csrf_exempt(async_view)
+
+    async def adispatch(self, read, request, *args, **kwargs):
+        """Async counterpart of APIView.dispatch for one read action"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            handler = getattr(self, f'a{read}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        if isinstance(self.response, Response):
+            self.response.render()
+
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """Negotiate, authenticate and check permissions"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        negotiated = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = negotiated
+        request.version, request.versioning_scheme = self.determine_version(
+            request, *args, **kwargs
+        )
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+
+    async def aperform_authentication(self, request):
+        """Authenticate with the first authenticator that accepts
+
+        Authenticators without an `aauthenticate` coroutine run in a
+        worker thread.
+        """
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, 'aauthenticate', None)
+            if authenticate is None:
+                authenticate = sync_to_async(authenticator.authenticate)
+            try:
+                result = await authenticate(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+
+        request._not_authenticated()
+
+    async def aget_object(self):
+        """Return the object of a detail request"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        """Return a page of serialized objects"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(
+            queryset, request, view=self,
+        )
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """Return one serialized object"""
+        instance = await self.aget_object()
+
+        return Response(self.get_serializer(instance).data)
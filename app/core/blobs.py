@@ -0,0 +1,108 @@
+"""
+Content addressed storage for uploaded images
+"""
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+from core import images
+from core.models import (
+    Collection,
+    Garment,
+    ImageBlob,
+    blob_file_path,
+)
+
+
+def file_sha256(upload):
+    """Return the hex SHA-256 of an uploaded file"""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+
+    return digest.hexdigest()
+
+
+@transaction.atomic
+def store(upload):
+    """Return the blob for an upload, writing the file only if new
+
+    The returned blob's reference count already includes the caller.
+    """
+    sha256 = file_sha256(upload)
+    blob, created = ImageBlob.objects.select_for_update().get_or_create(
+        sha256=sha256,
+        defaults={
+            'name': blob_file_path(sha256, upload.name),
+            'size': upload.size,
+            'ref_count': 1,
+        },
+    )
+    if created:
+        if default_storage.exists(blob.name):
+            default_storage.delete(blob.name)
+        name = default_storage.save(blob.name, upload)
+        if name != blob.name:
+            blob.name = name
+            blob.save(update_fields=['name'])
+    else:
+        ImageBlob.objects.filter(pk=blob.pk).update(
+            ref_count=F('ref_count') + 1,
+        )
+
+    return blob
+
+
+def _delete_file(name):
+    """Delete a stored image and its variants"""
+    for variant in images.variant_names(name):
+        default_storage.delete(variant)
+    default_storage.delete(name)
+
+
+def _delete_unused(sha256, name):
+    """Delete the file of a released blob unless it was stored again
+
+    Claiming the hash with a placeholder row waits for a concurrent
+    store() of the same content to commit, or makes it wait until the
+    file is gone.
+    """
+    with transaction.atomic():
+        blob, created = ImageBlob.objects.select_for_update().get_or_create(
+            sha256=sha256,
+            defaults={'name': name, 'size': 0},
+        )
+        if not created:
+            return
+        _delete_file(name)
+        blob.delete()
+
+
+@transaction.atomic
+def release(name):
+    """Drop one reference to a stored image, deleting it when unused
+
+    Images stored before blobs existed are deleted once no collection or
+    garment points at them.
+    """
+    if not name:
+        return
+
+    blob = ImageBlob.objects.select_for_update().filter(name=name).first()
+    if blob is not None:
+        if blob.ref_count > 1:
+            ImageBlob.objects.filter(pk=blob.pk).update(
+                ref_count=F('ref_count') - 1,
+            )
+            return
+        blob.delete()
+        transaction.on_commit(lambda: _delete_unused(blob.sha256, name))
+        return
+    if Collection.objects.filter(image=name).exists() or \
+            Garment.objects.filter(image=name).exists():
+        return
+
+    transaction.on_commit(lambda: _delete_file(name))
@@ -0,0 +1,153 @@
+"""
+Denormalized relation counters of collections, tags and garments
+"""
+from django.db import transaction
+from django.db.models import (
+    Count,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+
+from core.models import Collection
+
+
+COLLECTION_COUNTERS = {
+    'tags': 'tag_count',
+    'garments': 'garment_count',
+}
+RELATED_COUNTER = 'collection_count'
+
+
+def _relation(field):
+    """Return the related model, link table and columns of a relation"""
+    relation = Collection._meta.get_field(field)
+
+    return (
+        relation.related_model,
+        relation.remote_field.through,
+        relation.m2m_field_name(),
+        relation.m2m_reverse_field_name(),
+    )
+
+
+def _link_count(links, column):
+    """Return the number of links pointing at the outer object"""
+    return Coalesce(
+        Subquery(
+            links.filter(**{column: OuterRef('pk')}).order_by().values(
+                column,
+            ).annotate(links=Count('pk')).values('links')
+        ),
+        0,
+    )
+
+
+def _lock(queryset, pks):
+    """Lock the rows of the given ids in pk order"""
+    list(
+        queryset.filter(pk__in=pks).order_by('pk').select_for_update(
+        ).values_list('pk', flat=True)
+    )
+
+
+def recount_links(field, collection_pks, related_pks):
+    """Recount both sides of changed links under row locks
+
+    The counter rows are locked before counting, collections first and
+    in pk order, so concurrent changes to the same objects count one
+    after another, each from a snapshot holding the links committed
+    before it. Links removed or added twice are then never counted twice.
+    """
+    model, through, owner, target = _relation(field)
+    with transaction.atomic():
+        _lock(Collection.objects, collection_pks)
+        _lock(model.objects, related_pks)
+        recount_collections(field, collection_pks)
+        recount_related(field, related_pks)
+
+
+def release_collections(pks):
+    """Recount tags and garments linked to collections being deleted
+
+    Rows are locked in the order of recount_links and counted without
+    the links of the deleted collections.
+    """
+    with transaction.atomic():
+        _lock(Collection.objects, pks)
+        for field in COLLECTION_COUNTERS:
+            model, through, owner, target = _relation(field)
+            related = list(
+                through.objects.filter(
+                    **{f'{owner}__in': pks}
+                ).values_list(target, flat=True).distinct()
+            )
+            _lock(model.objects, related)
+            _recount(
+                model.objects.all(),
+                RELATED_COUNTER,
+                through.objects.exclude(**{f'{owner}__in': pks}),
+                target,
+                related,
+            )
+
+
+def release_related(field, pks):
+    """Recount collections linked to tags or garments being deleted
+
+    Links of the locked tags or garments cannot change any more, so the
+    collections are read again before counting.
+    """
+    model, through, owner, target = _relation(field)
+    links = through.objects.filter(**{f'{target}__in': pks})
+    with transaction.atomic():
+        collections = set(links.values_list(owner, flat=True))
+        _lock(Collection.objects, collections)
+        _lock(model.objects, pks)
+        collections.update(links.values_list(owner, flat=True))
+        _recount(
+            Collection.objects.all(),
+            COLLECTION_COUNTERS[field],
+            through.objects.exclude(**{f'{target}__in': pks}),
+            owner,
+            collections,
+        )
+
+
+def _recount(queryset, name, links, column, pks):
+    """Correct a counter column from the link table"""
+    if pks is not None:
+        queryset = queryset.filter(pk__in=list(pks))
+    actual = _link_count(links, column)
+
+    return queryset.exclude(**{name: actual}).update(**{name: actual})
+
+
+def recount_collections(field, pks=None):
+    """Recompute a collection counter, return the rows corrected
+
+    Only rows whose stored value differs are written. Without ids every
+    collection is checked.
+    """
+    model, through, owner, target = _relation(field)
+
+    return _recount(
+        Collection.objects.all(),
+        COLLECTION_COUNTERS[field],
+        through.objects.all(),
+        owner,
+        pks,
+    )
+
+
+def recount_related(field, pks=None):
+    """Recompute the collection counter of tags or garments"""
+    model, through, owner, target = _relation(field)
+
+    return _recount(
+        model.objects.all(),
+        RELATED_COUNTER,
+        through.objects.all(),
+        target,
+        pks,
+    )
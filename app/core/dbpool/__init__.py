@@ -0,0 +1,146 @@
+"""
+In-process PostgreSQL connection pool shared by the threads of a worker
+"""
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+
+pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free within the pool timeout"""
+
+
+class ConnectionPool:
+    """Lend psycopg2 connections, opening at most `max_size` of them"""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, connect, check=None):
+        """Return an idle connection, or a new one from `connect`
+
+        Waits up to `timeout` seconds when every connection is in use.
+        Idle connections failing `check` are closed and replaced.
+        """
+        start = time.monotonic()
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection free after {self.timeout}s'
+                    )
+                self._condition.wait(remaining)
+
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self._waits += 1
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+            self._in_use += 1
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                self._size += 1
+
+        if connection is not None and check is not None \
+                and not check(connection):
+            # Reopen in the same slot
+            connection.close()
+            connection = None
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                self._forget()
+                raise
+
+        return connection
+
+    def release(self, connection):
+        """Take a connection back, closing it if it is not reusable"""
+        if not connection.closed:
+            try:
+                connection.rollback()
+            except Exception:
+                connection.close()
+        if connection.closed:
+            self._forget()
+            return
+
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def _forget(self):
+        """Drop a lent connection that will not come back"""
+        with self._condition:
+            self._in_use -= 1
+            self._size -= 1
+            self._condition.notify()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._condition:
+            while self._idle:
+                self._idle.pop().close()
+                self._size -= 1
+
+    def stats(self):
+        """Return usage counters of the pool"""
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waits': self._waits,
+                'wait_time_ms': round(self._wait_time * 1000, 3),
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'timeouts': self._timeouts,
+            }
+
+
+def get_pool(alias, database, options):
+    """Return the pool of a connection alias and database, creating it"""
+    key = (alias, database)
+    with _pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 5),
+            )
+
+        return pools[key]
+
+
+def close_all():
+    """Close idle connections of every pool"""
+    with _pools_lock:
+        for pool in pools.values():
+            pool.close()
+
+
+def get_stats():
+    """Return the counters of every pool keyed by alias and database"""
+    with _pools_lock:
+        return {
+            f'{alias}/{database}': pool.stats()
+            for (alias, database), pool in pools.items()
+        }
@@ -0,0 +1,68 @@
+"""
+PostgreSQL backend borrowing connections from an in-process pool
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import (
+    DatabaseCreation as BaseDatabaseCreation,
+)
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core import dbpool
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    """Close pooled connections before dropping a test database"""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        dbpool.close_all()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Use like the postgresql backend, with CONN_MAX_AGE left at 0
+
+    Closing returns the connection to the pool of the process, so each
+    request borrows an open connection instead of opening one.
+    """
+
+    creation_class = DatabaseCreation
+
+    def _pool(self):
+        """Return the pool for the database of this connection"""
+        return dbpool.get_pool(
+            self.alias,
+            self.settings_dict['NAME'],
+            self.settings_dict.get('POOL', {}),
+        )
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = IsolationLevel(
+            options.get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+
+        return self._pool().acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            check=(
+                self._is_alive if self.settings_dict['CONN_HEALTH_CHECKS']
+                else None
+            ),
+        )
+
+    def _is_alive(self, connection):
+        """Return whether an idle pooled connection still answers"""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except self.Database.Error:
+            return False
+
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool().release(self.connection)
@@ -0,0 +1,134 @@
+"""
+Password hashers tuned from settings and deferred rehashing
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    make_password,
+)
+from django.db import connection
+
+from core import authentication
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """Scrypt with its cost read from PASSWORD_SCRYPT_* settings"""
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses more than 32 MiB unless a limit is given
+        return 256 * self.work_factor * self.block_size
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with its cost read from PASSWORD_ARGON2_* settings
+
+    Needs the argon2-cffi package.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+def _get_executor():
+    """Return the thread pool running rehashes, creating it once"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_REHASH_WORKERS,
+            thread_name_prefix='rehash',
+        )
+
+    return _executor
+
+
+def rehash(user_id, raw_password, encoded):
+    """Store a new hash unless the password changed in the meantime"""
+    updated = get_user_model().objects.filter(
+        pk=user_id,
+        password=encoded,
+    ).update(password=make_password(raw_password))
+    if updated:
+        authentication.forget_user(user_id)
+
+    return updated
+
+
+def _run_rehash(*args):
+    """Rehash from a pool thread, closing its connection afterwards"""
+    try:
+        rehash(*args)
+    except Exception:
+        logger.exception('Password rehash failed')
+    finally:
+        connection.close()
+
+
+def schedule_rehash(user, raw_password):
+    """Upgrade an outdated hash off the request path
+
+    With PASSWORD_REHASH_WORKERS set to 0 the rehash runs inline.
+    """
+    args = (user.pk, raw_password, user.password)
+    if settings.PASSWORD_REHASH_WORKERS <= 0:
+        rehash(*args)
+        return
+
+    _get_executor().submit(_run_rehash, *args)
+
+
+class DeferredRehashBackend(ModelBackend):
+    """Authenticate like ModelBackend, upgrading outdated hashes later"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown emails take as long as known ones
+            make_password(password)
+            return None
+
+        valid = check_password(
+            password,
+            user.password,
+            setter=lambda raw_password: schedule_rehash(user, raw_password),
+        )
+        if valid and self.user_can_authenticate(user):
+            return user
+
+        return None
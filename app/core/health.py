@@ -0,0 +1,117 @@
+"""
+Dependency probes for the readiness endpoint
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+
+
+PROBE_KEY = 'health:probe:{token}'
+
+
+def check_database():
+    """Run a trivial query"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_media():
+    """Write and delete a small file in media storage"""
+    name = default_storage.save(
+        f'health/{uuid.uuid4().hex}.txt',
+        ContentFile(b'ok'),
+    )
+    default_storage.delete(name)
+
+
+def check_cache():
+    """Store, read back and delete a value under a key of this probe"""
+    value = uuid.uuid4().hex
+    key = PROBE_KEY.format(token=value)
+    cache.set(key, value, 10)
+    try:
+        if cache.get(key) != value:
+            raise RuntimeError('Cache returned a different value')
+    finally:
+        cache.delete(key)
+
+
+CHECKS = {
+    'database': check_database,
+    'media': check_media,
+    'cache': check_cache,
+}
+
+
+def _probe(check):
+    """Run one check and return its outcome and latency
+
+    Only the exception type is reported, messages may hold hostnames.
+    """
+    start = time.perf_counter()
+    try:
+        check()
+        error = None
+    except Exception as exc:
+        error = type(exc).__name__
+    latency = (time.perf_counter() - start) * 1000
+
+    result = {
+        'ok': error is None and latency <= settings.HEALTH_MAX_LATENCY_MS,
+        'latency_ms': round(latency, 3),
+    }
+    if error is not None:
+        result['error'] = error
+    elif not result['ok']:
+        result['error'] = 'slow'
+
+    return result
+
+
+def run_checks():
+    """Probe every dependency and return the readiness report"""
+    checks = {name: _probe(check) for name, check in CHECKS.items()}
+
+    return {
+        'ready': all(result['ok'] for result in checks.values()),
+        'checks': checks,
+    }
+
+
+class ProbeCache:
+    """Share one readiness report per process for a short time
+
+    Concurrent probes wait for the one in progress instead of running
+    their own checks.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._report = None
+        self._expires = 0
+        self._lock = threading.Lock()
+
+    def get(self, probe=run_checks):
+        """Return the current report, probing if it expired"""
+        with self._lock:
+            now = time.monotonic()
+            if self._report is None or self._expires <= now:
+                self._report = probe()
+                self._expires = now + self.timeout
+
+            return self._report
+
+    def clear(self):
+        """Forget the current report"""
+        with self._lock:
+            self._report = None
+
+
+readiness = ProbeCache(settings.HEALTH_PROBE_TTL)
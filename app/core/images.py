@@ -0,0 +1,86 @@
+"""
+Resized image variants for uploaded images
+"""
+import os
+from io import BytesIO
+
+from PIL import (
+    Image,
+    ImageOps,
+)
+
+from django.core.files.base import ContentFile
+
+
+VARIANT_SIZES = (128, 512, 1024)
+VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+VARIANT_EXTENSIONS = {
+    'webp': '.webp',
+    'jpeg': '.jpg',
+}
+VARIANT_QUALITY = 80
+
+
+def variant_name(name, size, fmt):
+    """Return the storage name of a variant of an image"""
+    root = os.path.splitext(name)[0]
+
+    return f'{root}_{size}{VARIANT_EXTENSIONS[fmt]}'
+
+
+def variant_names(name):
+    """Return the storage names of every variant of an image"""
+    return [
+        variant_name(name, size, fmt)
+        for size in VARIANT_SIZES
+        for fmt in VARIANT_FORMATS
+    ]
+
+
+def has_variants(field_file):
+    """Return whether every variant of an image exists in storage"""
+    return all(
+        field_file.storage.exists(name)
+        for name in variant_names(field_file.name)
+    )
+
+
+def generate_variants(field_file):
+    """Write resized WebP and JPEG variants of an image to its storage"""
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image = image.convert('RGB')
+
+    for size in VARIANT_SIZES:
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for fmt, pil_format in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=pil_format, quality=VARIANT_QUALITY)
+            name = variant_name(field_file.name, size, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def delete_variants(field_file):
+    """Remove the variants of an image from its storage"""
+    for name in variant_names(field_file.name):
+        field_file.storage.delete(name)
+
+
+def variant_urls(field_file):
+    """Return variant URLs keyed by size and format"""
+    storage = field_file.storage
+
+    return {
+        str(size): {
+            fmt: storage.url(variant_name(field_file.name, size, fmt))
+            for fmt in VARIANT_FORMATS
+        }
+        for size in VARIANT_SIZES
+    }
@@ -0,0 +1,277 @@
+"""
+Batched import of wardrobe records from NDJSON or CSV
+"""
+import csv
+import io
+import json
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import (
+    connection,
+    transaction,
+)
+
+from core import (
+    counters,
+    search,
+)
+from core.models import (
+    Collection,
+    Tag,
+    Garment,
+)
+
+
+KINDS = ('user', 'tag', 'garment', 'collection')
+FORMATS = ('ndjson', 'csv')
+
+
+class RecordError(ValueError):
+    """Raised when an input file cannot be parsed"""
+
+
+def read_records(stream, fmt):
+    """Yield records from a text stream one at a time"""
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if value}
+        return
+
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise RecordError(f'Line {number}: {exc}') from exc
+
+
+def _key(value):
+    """Return the lookup key of a legacy id"""
+    return None if value is None else str(value)
+
+
+def _id_list(value):
+    """Return legacy ids from a list or a semicolon separated string"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(';')
+
+    return [_key(item) for item in value if item != '']
+
+
+class WardrobeImporter:
+    """Import users, tags, garments and collections in batches
+
+    Records are buffered per type and written with one bulk_create per
+    batch, each batch in its own transaction. Records reference each
+    other by their legacy ids, which are mapped to the new primary keys
+    as batches are written; a batch flushes every type it depends on
+    first, so references only need to appear earlier in the input.
+    """
+
+    def __init__(self, batch_size=5000, owner=None, progress=None):
+        self.batch_size = batch_size
+        self.owner = owner
+        self.progress = progress
+        self.ids = {kind: {} for kind in KINDS[:-1]}
+        self.pending = {kind: [] for kind in KINDS}
+        self.counts = Counter()
+        self.skipped = 0
+        self.existing_users = set()
+
+    @property
+    def processed(self):
+        """Return the number of records written so far"""
+        return sum(self.counts.values())
+
+    def add(self, record):
+        """Queue a record, writing its batch once it is full"""
+        kind = record.get('type') if isinstance(record, dict) else None
+        if kind not in self.pending or (kind == 'user' and self.owner):
+            self.skipped += 1
+            return
+
+        self.pending[kind].append(record)
+        if len(self.pending[kind]) >= self.batch_size:
+            self.flush(kind)
+
+    def flush(self, kind=None):
+        """Write pending records of a type and the types it depends on"""
+        last = KINDS.index(kind) if kind else len(KINDS) - 1
+        for name in KINDS[:last + 1]:
+            records = self.pending[name]
+            if not records:
+                continue
+            self.pending[name] = []
+            with transaction.atomic():
+                getattr(self, f'_import_{name}s')(records)
+            if self.progress:
+                self.progress(self)
+
+    def _map(self, kind, record, pk):
+        """Remember the new primary key of a record with a legacy id"""
+        key = _key(record.get('id'))
+        if key is not None:
+            self.ids[kind][key] = pk
+
+    def _owner(self, record):
+        """Return the id of the user owning a record"""
+        if self.owner:
+            return self.owner.pk
+
+        return self.ids['user'].get(_key(record.get('user')))
+
+    def _import_users(self, records):
+        """Create users that do not exist yet and map their ids"""
+        model = get_user_model()
+        emails = {}
+        for record in records:
+            email = model.objects.normalize_email(record.get('email') or '')
+            if email:
+                emails.setdefault(email, record)
+        self.skipped += len(records) - len(emails)
+
+        existing = dict(
+            model.objects.filter(email__in=emails).values_list('email', 'id')
+        )
+        self.existing_users.update(existing.values())
+        model.objects.bulk_create(
+            [
+                model(
+                    email=email,
+                    name=record.get('name', ''),
+                    password=record.get('password') or make_password(None),
+                )
+                for email, record in emails.items()
+                if email not in existing
+            ],
+            ignore_conflicts=True,
+        )
+        found = dict(
+            model.objects.filter(email__in=emails).values_list('email', 'id')
+        )
+        for email, record in emails.items():
+            self._map('user', record, found[email])
+        self.counts['user'] += len(emails)
+
+    def _import_tags(self, records):
+        """Create tags missing for their user and map ids
+
+        Tag names are unique per user, so records sharing a name map to
+        the same tag.
+        """
+        names = {}
+        for record in records:
+            user_id = self._owner(record)
+            if user_id is None or not record.get('name'):
+                self.skipped += 1
+                continue
+            names.setdefault((user_id, record['name']), []).append(record)
+
+        def lookup():
+            return {
+                (user_id, name): pk
+                for user_id, name, pk in Tag.objects.filter(
+                    user_id__in={user_id for user_id, name in names},
+                    name__in={name for user_id, name in names},
+                ).values_list('user_id', 'name', 'id')
+            }
+
+        existing = lookup()
+        missing = [key for key in names if key not in existing]
+        if missing:
+            Tag.objects.bulk_create(
+                [
+                    Tag(user_id=user_id, name=name)
+                    for user_id, name in missing
+                ],
+                ignore_conflicts=True,
+            )
+            existing = lookup()
+
+        for key, group in names.items():
+            for record in group:
+                self._map('tag', record, existing[key])
+            self.counts['tag'] += len(group)
+
+    def _import_garments(self, records):
+        """Create one garment per record and map ids
+
+        Garment names are not unique, so every record gets its own row.
+        """
+        objs = []
+        for record in records:
+            user_id = self._owner(record)
+            if user_id is None or not record.get('name'):
+                self.skipped += 1
+                continue
+            objs.append(
+                (record, Garment(user_id=user_id, name=record['name']))
+            )
+        Garment.objects.bulk_create([obj for record, obj in objs])
+
+        for record, obj in objs:
+            self._map('garment', record, obj.pk)
+        self.counts['garment'] += len(objs)
+
+    def _import_collections(self, records):
+        """Create collections and link their tags and garments"""
+        objs = []
+        for record in records:
+            user_id = self._owner(record)
+            if user_id is None or not record.get('title'):
+                self.skipped += 1
+                continue
+            objs.append((record, Collection(
+                user_id=user_id,
+                title=record['title'],
+                description=record.get('description', ''),
+                link=record.get('link', ''),
+            )))
+        Collection.objects.bulk_create([obj for record, obj in objs])
+
+        pks = [obj.pk for record, obj in objs]
+        for field, kind in (('tags', 'tag'), ('garments', 'garment')):
+            ids = self.ids[kind]
+            rows = dict.fromkeys(
+                (obj.pk, ids[key])
+                for record, obj in objs
+                for key in _id_list(record.get(field))
+                if key in ids
+            )
+            self._copy_links(getattr(Collection, field).through, list(rows))
+            counters.recount_collections(field, pks)
+            counters.recount_related(field, {right for left, right in rows})
+        search.update_search_vectors(pks)
+        self.counts['collection'] += len(objs)
+
+    def _copy_links(self, through, rows):
+        """Insert collection relation rows, with COPY on Postgres"""
+        if not rows:
+            return
+        columns = [
+            field.column for field in through._meta.fields
+            if not field.primary_key
+        ]
+
+        with connection.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):
+                data = io.StringIO(
+                    ''.join(f'{left}\t{right}\n' for left, right in rows)
+                )
+                quote = connection.ops.quote_name
+                cursor.copy_expert(
+                    f'COPY {quote(through._meta.db_table)} '
+                    f'({", ".join(map(quote, columns))}) FROM STDIN',
+                    data,
+                )
+                return
+
+        through.objects.bulk_create([
+            through(**dict(zip(columns, row))) for row in rows
+        ])
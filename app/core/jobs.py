@@ -0,0 +1,122 @@
+"""
+Database backed queue for image post-processing
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import images
+from core.models import (
+    ImageJob,
+    ImageStatus,
+)
+
+
+def set_image_status(obj, status, image=None):
+    """Save the image status of a collection or garment
+
+    With an image name the status is only saved, and True returned,
+    while the object still holds that image, so a job never overwrites
+    the status of a newer upload.
+    """
+    with transaction.atomic():
+        if image is not None:
+            current = type(obj).objects.select_for_update().filter(
+                pk=obj.pk,
+            ).values_list('image', flat=True).first()
+            if current != image:
+                return False
+        obj.image_status = status
+        obj.save(update_fields=['image_status', 'updated_at'])
+
+    return True
+
+
+def enqueue_image_job(obj):
+    """Mark an image as pending and queue it for processing"""
+    if obj.image_status != ImageStatus.PENDING:
+        set_image_status(obj, ImageStatus.PENDING)
+    job, created = ImageJob.objects.get_or_create(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+        status=ImageJob.Status.PENDING,
+    )
+
+    return job
+
+
+def claim_next_job():
+    """Lock and return the next runnable job, or None
+
+    Jobs stuck in running longer than the lock timeout, e.g. after a
+    worker crash, are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.IMAGE_JOB_LOCK_TIMEOUT)
+    with transaction.atomic():
+        job = ImageJob.objects.select_for_update(skip_locked=True).filter(
+            Q(status=ImageJob.Status.PENDING, run_after__lte=now) |
+            Q(status=ImageJob.Status.RUNNING, locked_at__lt=stale)
+        ).order_by('run_after').first()
+        if job is None:
+            return None
+
+        job.status = ImageJob.Status.RUNNING
+        job.locked_at = now
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_at', 'attempts'])
+
+    return job
+
+
+def run_job(job):
+    """Process a claimed job, scheduling a retry if it fails"""
+    obj = job.target
+    if obj is None or not obj.image:
+        job.status = ImageJob.Status.DONE
+        job.save(update_fields=['status'])
+        return
+
+    name = obj.image.name
+    if not set_image_status(obj, ImageStatus.PROCESSING, name):
+        # Replaced by a newer upload, which has a job of its own
+        job.status = ImageJob.Status.DONE
+        job.save(update_fields=['status'])
+        return
+
+    try:
+        if not images.has_variants(obj.image):
+            images.generate_variants(obj.image)
+    except Exception as exc:
+        job.last_error = repr(exc)
+        if job.attempts < settings.IMAGE_JOB_MAX_ATTEMPTS:
+            delay = settings.IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.status = ImageJob.Status.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            set_image_status(obj, ImageStatus.PENDING, name)
+        else:
+            job.status = ImageJob.Status.FAILED
+            set_image_status(obj, ImageStatus.FAILED, name)
+        job.save(update_fields=['status', 'run_after', 'last_error'])
+        return
+
+    set_image_status(obj, ImageStatus.READY, name)
+    job.status = ImageJob.Status.DONE
+    job.save(update_fields=['status'])
+
+
+def run_pending_jobs(limit=None):
+    """Run runnable jobs until the queue is empty, return the count"""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+
+    return processed
@@ -0,0 +1,191 @@
+"""
+Django command to benchmark collection list filters
+"""
+import random
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import (
+    connection,
+    transaction,
+)
+
+from core.models import (
+    Collection,
+    Tag,
+    Garment,
+)
+from collection import filters
+
+
+class Command(BaseCommand):
+    """Django command to time filters on generated data"""
+
+    help = (
+        'Generate a user with many collections, time the list filters '
+        'against it and roll the data back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collections',
+            type=int,
+            default=5000,
+            help='Collections to generate.',
+        )
+        parser.add_argument(
+            '--tags',
+            type=int,
+            default=50,
+            help='Tags to generate.',
+        )
+        parser.add_argument(
+            '--garments',
+            type=int,
+            default=200,
+            help='Garments to generate.',
+        )
+        parser.add_argument(
+            '--per-collection',
+            type=int,
+            default=3,
+            help='Tags and garments linked to each collection.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per case, the median is reported.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        with transaction.atomic():
+            user, tags, garments = self._seed(options)
+            for label, queryset in self._cases(user, tags, garments):
+                self._report(label, queryset, options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def _seed(self, options):
+        """Create the benchmark user and its wardrobe"""
+        rng = random.Random(0)
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex}@example.com',
+        )
+        tags = Tag.objects.bulk_create(
+            Tag(user=user, name=f'Tag {i}') for i in range(options['tags'])
+        )
+        garments = Garment.objects.bulk_create(
+            Garment(user=user, name=f'Garment {i}')
+            for i in range(options['garments'])
+        )
+        collections = Collection.objects.bulk_create(
+            (
+                Collection(user=user, title=f'Collection {i}')
+                for i in range(options['collections'])
+            ),
+            batch_size=5000,
+        )
+
+        for field, related in (('tags', tags), ('garments', garments)):
+            through = getattr(Collection, field).through
+            target = Collection._meta.get_field(field).m2m_reverse_name()
+            linked = related[:max(1, len(related) * 4 // 5)]
+            count = min(options['per_collection'], len(linked))
+            through.objects.bulk_create(
+                (
+                    through(collection_id=collection.pk, **{target: obj.pk})
+                    for collection in collections
+                    for obj in rng.sample(linked, count)
+                ),
+                batch_size=5000,
+            )
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'ANALYZE core_collection, core_collection_tags, '
+                    'core_collection_garments, core_tag, core_garment'
+                )
+        self.stdout.write(
+            f'Generated {len(collections)} collections, {len(tags)} tags '
+            f'and {len(garments)} garments'
+        )
+
+        return user, tags, garments
+
+    def _cases(self, user, tags, garments):
+        """Return labelled querysets to time"""
+        collections = Collection.objects.filter(user=user).order_by('-id')
+        user_garments = Garment.objects.filter(user=user).order_by(
+            '-name',
+            '-id',
+        )
+        tag_ids = [tag.pk for tag in tags[:2]]
+        garment_ids = [garment.pk for garment in garments[:3]]
+
+        return [
+            (
+                'tags any (join+distinct)',
+                collections.filter(tags__id__in=tag_ids).distinct(),
+            ),
+            (
+                'tags any (exists)',
+                filters.with_any(collections, 'tags', tag_ids),
+            ),
+            (
+                'tags all (having count)',
+                filters.with_all(collections, 'tags', tag_ids),
+            ),
+            (
+                'exclude tags (not exists)',
+                filters.without(collections, 'tags', tag_ids),
+            ),
+            (
+                'garments any, exclude tags',
+                filters.filter_related(
+                    filters.with_any(collections, 'garments', garment_ids),
+                    'tags',
+                    exclude=tag_ids,
+                ),
+            ),
+            (
+                'garments assigned (join+distinct)',
+                user_garments.filter(collection__isnull=False).distinct(),
+            ),
+            (
+                'garments assigned (exists)',
+                filters.assigned(user_garments, 'garments'),
+            ),
+            (
+                'garments unassigned (not exists)',
+                filters.unassigned(user_garments, 'garments'),
+            ),
+        ]
+
+    def _report(self, label, queryset, repeat):
+        """Time a first page and a count of a queryset"""
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        page_times = []
+        count_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.values_list('pk', flat=True)[:page_size])
+            page_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rows = queryset.count()
+            count_times.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f'{label:<34} '
+            f'page {statistics.median(page_times) * 1000:8.2f} ms  '
+            f'count {statistics.median(count_times) * 1000:8.2f} ms  '
+            f'{rows:>8} rows'
+        )
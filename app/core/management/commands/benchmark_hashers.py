@@ -0,0 +1,72 @@
+"""
+Django command to benchmark password hashing throughput
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """Django command to time each password hasher profile on one core"""
+
+    help = (
+        'Hash a password repeatedly with each hasher profile and report '
+        'the time per hash and the hashes per second a single core '
+        'sustains with the configured costs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles',
+            nargs='*',
+            help='Profiles to time, all of PASSWORD_HASHER_PROFILES by '
+                 'default.',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=10,
+            help='Hashes computed per profile.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        profiles = options['profiles'] or list(
+            settings.PASSWORD_HASHER_PROFILES
+        )
+        unknown = set(profiles) - set(settings.PASSWORD_HASHER_PROFILES)
+        if unknown:
+            raise CommandError(f'Unknown profiles: {", ".join(unknown)}')
+
+        for name in profiles:
+            hasher = import_string(settings.PASSWORD_HASHER_PROFILES[name])()
+            try:
+                hasher.encode('warm up password', hasher.salt())
+            except ValueError as exc:
+                self.stdout.write(f'{name:<8} unavailable: {exc}')
+                continue
+            self._report(name, hasher, options['rounds'])
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def _report(self, name, hasher, rounds):
+        """Time a number of hashes with one hasher"""
+        times = []
+        for i in range(rounds):
+            salt = hasher.salt()
+            start = time.perf_counter()
+            hasher.encode(f'benchmark password {i}', salt)
+            times.append(time.perf_counter() - start)
+
+        median = statistics.median(times)
+        marker = '*' if name == settings.PASSWORD_HASHER else ' '
+        self.stdout.write(
+            f'{name + marker:<9} {median * 1000:8.2f} ms/hash  '
+            f'{1 / median:8.1f} hashes/s per core'
+        )
@@ -0,0 +1,31 @@
+"""
+Django command to remove finished and expired upload sessions
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core import uploads
+from core.models import UploadSession
+
+
+class Command(BaseCommand):
+    """Django command to clear stale upload sessions"""
+
+    help = 'Delete complete or expired upload sessions and their chunks.'
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        stale = UploadSession.objects.filter(
+            Q(status=UploadSession.Status.COMPLETE) |
+            Q(expires_at__lte=timezone.now())
+        )
+        removed = 0
+        for session in stale.iterator():
+            uploads.discard(session)
+            session.delete()
+            removed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Removed {removed} upload sessions')
+        )
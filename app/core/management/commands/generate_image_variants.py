@@ -0,0 +1,50 @@
+"""
+Django command to generate resized variants of uploaded images
+"""
+from django.core.management.base import BaseCommand
+
+from core import (
+    images,
+    jobs,
+)
+from core.models import (
+    Collection,
+    Garment,
+    ImageStatus,
+)
+
+
+class Command(BaseCommand):
+    """Django command to backfill image variants"""
+
+    help = 'Generate resized variants for existing collection and ' \
+        'garment images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants that already exist.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        generated = 0
+        for model in (Collection, Garment):
+            queryset = model.objects.exclude(image='').exclude(image=None)
+            for obj in queryset.iterator():
+                if not options['force'] and images.has_variants(obj.image):
+                    continue
+                try:
+                    images.generate_variants(obj.image)
+                except (OSError, ValueError) as exc:
+                    self.stderr.write(
+                        f'Skipping {model.__name__} {obj.pk}: {exc}'
+                    )
+                    continue
+                jobs.set_image_status(obj, ImageStatus.READY, obj.image.name)
+                generated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated variants for {generated} images')
+        )
@@ -0,0 +1,103 @@
+"""
+Django command to import wardrobe data from NDJSON or CSV files
+"""
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from core import importer
+from collection.cache import invalidate_user
+
+
+class Command(BaseCommand):
+    """Django command to bulk import users, tags, garments and collections"""
+
+    help = (
+        'Import NDJSON or CSV records of users, tags, garments and '
+        'collections in batches. Records reference each other by legacy '
+        'id; user passwords must already be hashed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='+',
+            help='Files to import, - reads from stdin.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=importer.FORMATS,
+            help='Input format, guessed from the file extension by default.',
+        )
+        parser.add_argument(
+            '--user',
+            help='Email of an existing user owning every imported record.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Records written per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        owner = None
+        if options['user']:
+            try:
+                owner = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'User {options["user"]} does not exist')
+
+        start = time.monotonic()
+
+        def progress(state):
+            elapsed = time.monotonic() - start
+            self.stdout.write(
+                f'{state.processed} records imported '
+                f'({state.processed / max(elapsed, 1e-6):.0f} records/s)'
+            )
+
+        wardrobe = importer.WardrobeImporter(
+            batch_size=options['batch_size'],
+            owner=owner,
+            progress=progress,
+        )
+        for path in options['paths']:
+            fmt = options['format'] or (
+                'csv' if path.lower().endswith('.csv') else 'ndjson'
+            )
+            try:
+                self._import_file(wardrobe, path, fmt)
+            except (OSError, importer.RecordError) as exc:
+                raise CommandError(f'{path}: {exc}')
+        wardrobe.flush()
+
+        for user_id in wardrobe.existing_users | {getattr(owner, 'pk', None)}:
+            if user_id is not None:
+                invalidate_user(user_id)
+
+        elapsed = time.monotonic() - start
+        counts = ', '.join(
+            f'{wardrobe.counts[kind]} {kind}s' for kind in importer.KINDS
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {counts} in {elapsed:.1f}s, '
+            f'skipped {wardrobe.skipped} records'
+        ))
+
+    def _import_file(self, wardrobe, path, fmt):
+        """Feed every record of a file to the importer"""
+        if path == '-':
+            for record in importer.read_records(sys.stdin, fmt):
+                wardrobe.add(record)
+            return
+
+        with open(path, newline='', encoding='utf-8') as stream:
+            for record in importer.read_records(stream, fmt):
+                wardrobe.add(record)
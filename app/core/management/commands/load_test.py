@@ -0,0 +1,145 @@
+"""
+Django command to load test running API servers
+"""
+import http.client
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+
+def _connect(parts, timeout):
+    """Open a keep-alive connection to the host of a URL"""
+    connection_class = (
+        http.client.HTTPSConnection if parts.scheme == 'https'
+        else http.client.HTTPConnection
+    )
+
+    return connection_class(parts.netloc, timeout=timeout)
+
+
+def run_client(url, headers, count, timeout):
+    """Send requests over one connection, return latencies and errors"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+
+    latencies = []
+    errors = 0
+    connection = _connect(parts, timeout)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = _connect(parts, timeout)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    """Django command to compare throughput and latency of servers"""
+
+    help = (
+        'Send concurrent GET requests to each target, e.g. the uwsgi and '
+        'asgi deployments of the same endpoint, and report requests per '
+        'second, requests per second per server core and latency '
+        'percentiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets',
+            nargs='+',
+            help='URLs to test, optionally labelled as label=url.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Requests sent to each target.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Clients sending requests at the same time.',
+        )
+        parser.add_argument(
+            '--token',
+            help='Token sent in the Authorization header.',
+        )
+        parser.add_argument(
+            '--server-cores',
+            type=int,
+            default=1,
+            help='Cores available to each server, to size workers.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Seconds to wait for each response.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        if options['requests'] < options['concurrency']:
+            raise CommandError('--requests must be at least --concurrency')
+
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+
+        for target in options['targets']:
+            label, _, url = target.rpartition('=')
+            if '://' not in url:
+                raise CommandError(f'Invalid target URL: {url}')
+            self._report(label or url, url, headers, options)
+
+        self.stdout.write(self.style.SUCCESS('Load test complete'))
+
+    def _report(self, label, url, headers, options):
+        """Load one target and write its throughput and latencies"""
+        concurrency = options['concurrency']
+        share, extra = divmod(options['requests'], concurrency)
+        counts = [share + (i < extra) for i in range(concurrency)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                lambda count: run_client(
+                    url, headers, count, options['timeout'],
+                ),
+                counts,
+            ))
+        elapsed = time.perf_counter() - start
+
+        latencies = [value for values, _ in results for value in values]
+        errors = sum(errors for _, errors in results)
+        p50, p95, p99 = [
+            statistics.quantiles(latencies, n=100)[i] * 1000
+            for i in (49, 94, 98)
+        ]
+        rate = len(latencies) / elapsed
+
+        self.stdout.write(
+            f'{label}: {len(latencies)} requests, {errors} errors, '
+            f'{rate:.1f} req/s, '
+            f'{rate / options["server_cores"]:.1f} req/s per core, '
+            f'p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms'
+        )
@@ -0,0 +1,58 @@
+"""
+Django command to recompute denormalized relation counters
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import counters
+from core.models import Collection
+
+
+class Command(BaseCommand):
+    """Django command to repair drifted relation counters"""
+
+    help = (
+        'Recount the tags and garments of every collection and the '
+        'collections of every tag and garment, fixing rows that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows checked per transaction.',
+        )
+
+    def _batches(self, model, size):
+        """Yield lists of primary keys in ascending order"""
+        last = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last).order_by('pk')
+                .values_list('pk', flat=True)[:size]
+            )
+            if not pks:
+                return
+            yield pks
+            last = pks[-1]
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        total = 0
+        for field, counter in counters.COLLECTION_COUNTERS.items():
+            related = Collection._meta.get_field(field).related_model
+            for model, name, recount in (
+                (Collection, counter, counters.recount_collections),
+                (related, counters.RELATED_COUNTER, counters.recount_related),
+            ):
+                corrected = 0
+                for pks in self._batches(model, options['batch_size']):
+                    with transaction.atomic():
+                        corrected += recount(field, pks)
+                self.stdout.write(
+                    f'{model._meta.object_name}.{name}: corrected {corrected}'
+                )
+                total += corrected
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired {total} counters'))
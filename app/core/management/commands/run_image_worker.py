@@ -0,0 +1,44 @@
+"""
+Django command to process queued image jobs
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    """Django command to run the image processing worker"""
+
+    help = 'Process queued image jobs until interrupted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry point for command"""
+        self.stdout.write('Waiting for image jobs...')
+        try:
+            while True:
+                processed = jobs.run_pending_jobs()
+                if processed:
+                    self.stdout.write(f'Processed {processed} image jobs')
+                if options['burst']:
+                    break
+                if not processed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Image worker stopped'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-17 02:16
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Point collections at the oldest tag of each duplicated name"""
+    Tag = apps.get_model('core', 'Tag')
+    Through = apps.get_model('core', 'Collection').tags.through
+
+    duplicates = (
+        Tag.objects.values('user_id', 'name')
+        .annotate(keep_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        extra_ids = list(
+            Tag.objects.filter(
+                user_id=duplicate['user_id'],
+                name=duplicate['name'],
+            ).exclude(id=duplicate['keep_id']).values_list('id', flat=True)
+        )
+        linked = Through.objects.filter(tag_id__in=extra_ids)
+        Through.objects.bulk_create(
+            [
+                Through(collection_id=collection_id, tag_id=duplicate['keep_id'])
+                for collection_id in linked.values_list(
+                    'collection_id', flat=True
+                ).distinct()
+            ],
+            ignore_conflicts=True,
+        )
+        Tag.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_garment_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-17 02:16
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_merge_duplicate_tags'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='collection',
+            index=models.Index(fields=['user', 'id'], name='collection_user_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='garment',
+            index=models.Index(fields=['user', 'name'], name='garment_user_name_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='tag',
+                    constraint=models.UniqueConstraint(fields=('user', 'name'), name='tag_user_name_unique'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "tag_user_name_unique" '
+                        'ON "core_tag" ("user_id", "name");',
+                        'ALTER TABLE "core_tag" ADD CONSTRAINT "tag_user_name_unique" '
+                        'UNIQUE USING INDEX "tag_user_name_unique";',
+                    ],
+                    reverse_sql=[
+                        'ALTER TABLE "core_tag" DROP CONSTRAINT IF EXISTS "tag_user_name_unique";',
+                    ],
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 03:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Compute search vectors of existing collections in batches"""
+    Collection = apps.get_model('core', 'Collection')
+    config = settings.SEARCH_CONFIG
+    garment_names = Subquery(
+        Collection.garments.through.objects.filter(
+            collection_id=OuterRef('pk'),
+        ).values('collection_id').annotate(
+            names=StringAgg('garment__name', ' '),
+        ).values('names')
+    )
+    vector = (
+        django.contrib.postgres.search.SearchVector('title', weight='A', config=config) +
+        django.contrib.postgres.search.SearchVector(garment_names, weight='B', config=config) +
+        django.contrib.postgres.search.SearchVector('description', weight='C', config=config)
+    )
+
+    last = 0
+    while True:
+        pks = list(
+            Collection.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not pks:
+            break
+        Collection.objects.filter(pk__in=pks).update(search_vector=vector)
+        last = pks[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_image_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='collection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='collection_search_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-17 03:24
+
+from django.db import migrations
+
+INDEXES = (
+    ('core_tag', 'tag_name_trgm_idx'),
+    ('core_garment', 'garment_name_trgm_idx'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Index names for trigram autocomplete where pg_trgm is available"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, index in INDEXES:
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index}" '
+                f'ON "{table}" USING gin (UPPER("name"::text) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Remove the trigram indexes"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for table, index in INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index}"')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_collection_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
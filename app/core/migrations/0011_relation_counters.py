@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 04:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _link_count(links, column):
+    return Coalesce(
+        Subquery(
+            links.filter(**{column: OuterRef('pk')}).order_by()
+            .values(column).annotate(links=Count('pk')).values('links')
+        ),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    """Count the existing links of every collection, tag and garment"""
+    Collection = apps.get_model('core', 'Collection')
+    Tag = apps.get_model('core', 'Tag')
+    Garment = apps.get_model('core', 'Garment')
+    tags = Collection.tags.through.objects.all()
+    garments = Collection.garments.through.objects.all()
+
+    Collection.objects.update(
+        tag_count=_link_count(tags, 'collection'),
+        garment_count=_link_count(garments, 'collection'),
+    )
+    Tag.objects.update(collection_count=_link_count(tags, 'tag'))
+    Garment.objects.update(collection_count=_link_count(garments, 'garment'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_name_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='garment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='collection',
+            name='tag_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='garment',
+            name='collection_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='collection_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
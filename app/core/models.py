@@ -5,7 +5,12 @@ import uuid
 import os
 
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -29,6 +34,22 @@ def garment_image_file_path(instance, filename):
     return os.path.join('uploads', 'garment', filename)
 
 
+def blob_file_path(sha256, filename):
+    """Generate content addressed file path for an image blob"""
+    ext = os.path.splitext(filename)[1].lower()
+
+    return os.path.join('uploads', 'blobs', sha256[:2], f'{sha256}{ext}')
+
+
+class ImageStatus(models.TextChoices):
+    """Processing state of an uploaded image"""
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+
 class UserManager(BaseUserManager):
     """Manager of users"""
 
@@ -65,7 +86,28 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
-class Collection(models.Model):
+class CounterFieldsMixin:
+    """Leave counters kept by set-based updates out of full saves
+
+    Saving an object loaded earlier would otherwise write back stale
+    counter values and lose concurrent increments.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and
+                field.name not in self.counter_fields and
+                field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Collection(CounterFieldsMixin, models.Model):
     """Collection object"""
 
     user = models.ForeignKey(
@@ -78,12 +120,29 @@ class Collection(models.Model):
     tags = models.ManyToManyField("Tag")
     garments = models.ManyToManyField("Garment")
     image = models.ImageField(null=True, upload_to=collection_image_file_path)
+    image_status = models.CharField(
+        max_length=16,
+        choices=ImageStatus.choices,
+        blank=True,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    tag_count = models.PositiveIntegerField(default=0, editable=False)
+    garment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('tag_count', 'garment_count')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='collection_user_id_idx'),
+            GinIndex(fields=['search_vector'], name='collection_search_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Tag(models.Model):
+class Tag(CounterFieldsMixin, models.Model):
     """Tag for filtering recipes"""
 
     name = models.CharField(max_length=255)
@@ -91,20 +150,170 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    collection_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('collection_count',)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='tag_user_name_unique',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Garment(models.Model):
+class Garment(CounterFieldsMixin, models.Model):
     """Garment for collection"""
 
     name = models.CharField(max_length=255)
     image = models.ImageField(null=True, upload_to=garment_image_file_path)
+    image_status = models.CharField(
+        max_length=16,
+        choices=ImageStatus.choices,
+        blank=True,
+    )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    collection_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('collection_count',)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'name'],
+                name='garment_user_name_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ImageJob(models.Model):
+    """Queued post-processing of an uploaded image"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.BigIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'],
+                name='imagejob_status_run_after_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.content_type.model} {self.object_id} ({self.status})'
+
+
+class UploadSession(models.Model):
+    """Resumable chunked upload of an image"""
+
+    class Status(models.TextChoices):
+        OPEN = 'open'
+        COMPLETE = 'complete'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.BigIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.OPEN,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.filename} ({self.status})'
+
+    @property
+    def total_chunks(self):
+        """Return the number of chunks the file is split into"""
+        return max(1, -(-self.size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        """Return the byte length of a chunk"""
+        if index == self.total_chunks - 1:
+            return self.size - self.chunk_size * index
+
+        return self.chunk_size
+
+
+class ImageBlob(models.Model):
+    """Stored image file shared by every upload with the same content"""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, db_index=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class AccessToken(models.Model):
+    """Issued expiring API token, kept so it can be revoked early"""
+
+    jti = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='access_tokens',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                name='accesstoken_expires_at_idx',
+            ),
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(revoked_at__isnull=False),
+                name='accesstoken_revoked_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,105 @@
+"""
+Full-text search over collections
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import (
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Cast
+
+from core.models import (
+    Collection,
+    Garment,
+)
+
+
+def is_supported():
+    """Return whether the database has native full-text search"""
+    return connection.vendor == 'postgresql'
+
+
+@lru_cache(maxsize=None)
+def has_trigram():
+    """Return whether the pg_trgm extension is installed"""
+    if not is_supported():
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def collection_vector():
+    """Return the expression computing a collection's search vector
+
+    Titles weigh most, then garment names, then the description.
+    """
+    config = settings.SEARCH_CONFIG
+    garment_names = Subquery(
+        Collection.garments.through.objects.filter(
+            collection_id=OuterRef('pk'),
+        ).values('collection_id').annotate(
+            names=StringAgg('garment__name', ' '),
+        ).values('names')
+    )
+
+    return (
+        SearchVector('title', weight='A', config=config) +
+        SearchVector(garment_names, weight='B', config=config) +
+        SearchVector('description', weight='C', config=config)
+    )
+
+
+def update_search_vectors(pks):
+    """Recompute the search vectors of the given collections"""
+    pks = list(pks)
+    if not pks or not is_supported():
+        return
+
+    Collection.objects.filter(pk__in=pks).update(
+        search_vector=collection_vector(),
+    )
+
+
+def search_collections(queryset, terms):
+    """Filter collections matching the terms and annotate their rank
+
+    Without Postgres every word must appear in the title, description
+    or a garment name, and all matches share the same rank.
+    """
+    if is_supported():
+        query = SearchQuery(
+            terms,
+            search_type='websearch',
+            config=settings.SEARCH_CONFIG,
+        )
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField()),
+        )
+
+    for word in terms.split():
+        queryset = queryset.filter(
+            Q(title__icontains=word) |
+            Q(description__icontains=word) |
+            Exists(Garment.objects.filter(
+                collection=OuterRef('pk'),
+                name__icontains=word,
+            ))
+        )
+
+    return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
@@ -0,0 +1,64 @@
+"""
+Signal handlers keeping cached token lookups and revocations current
+"""
+from django.conf import settings
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from core import (
+    authentication,
+    tokens,
+)
+
+
+def _only_last_login(update_fields):
+    """Return whether a save only records a login"""
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def note_credential_change(sender, instance, update_fields=None, **kwargs):
+    """Flag saves that change the password or deactivate the user"""
+    instance._revoke_tokens = False
+    if instance.pk is None or _only_last_login(update_fields):
+        return
+    stored = sender.objects.filter(pk=instance.pk).values(
+        'password',
+        'is_active',
+    ).first()
+    instance._revoke_tokens = stored is not None and (
+        stored['password'] != instance.password
+        or stored['is_active'] and not instance.is_active
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_saved_user(sender, instance, update_fields=None, **kwargs):
+    """Drop cached tokens after a password, activation or profile change
+
+    Signed tokens of the user are revoked when the password changed or
+    the user was deactivated.
+    """
+    if _only_last_login(update_fields):
+        return
+    if getattr(instance, '_revoke_tokens', False):
+        tokens.revoke_user(instance.pk)
+    authentication.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_deleted_user(sender, instance, **kwargs):
+    """Drop the cached copy of a deleted user"""
+    authentication.forget_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Drop the cached user of a deleted token"""
+    authentication.forget_tokens(instance.key)
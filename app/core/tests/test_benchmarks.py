@@ -0,0 +1,158 @@
+"""
+Tests for benchmark commands
+"""
+import threading
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+
+from core.management.commands import benchmark_filters
+from core.models import Collection
+
+
+def rows_before_distinct(queryset):
+    """Return the rows a queryset produces before removing duplicates"""
+    queryset = queryset.all()
+    queryset.query.distinct = False
+
+    return queryset.count()
+
+
+class BenchmarkFiltersTests(TestCase):
+    """Test the filter benchmark command"""
+
+    def test_benchmark_rolls_back(self):
+        """Test every case is reported and generated data is removed"""
+        out = StringIO()
+
+        call_command(
+            'benchmark_filters',
+            '--collections', '30',
+            '--repeat', '1',
+            stdout=out,
+        )
+
+        self.assertIn('tags all (having count)', out.getvalue())
+        self.assertIn('exclude tags (not exists)', out.getvalue())
+        self.assertIn('garments unassigned (not exists)', out.getvalue())
+        self.assertFalse(Collection.objects.exists())
+
+    def test_filter_work_by_size(self):
+        """Test EXISTS rows stay flat while the join grows with links
+
+        Every case is one query at both sizes. Before DISTINCT the join
+        yields a row per link, the EXISTS filter a row per garment.
+        """
+        command = benchmark_filters.Command(stdout=StringIO())
+        rows = {}
+        for size in (20, 40):
+            options = {
+                'collections': size,
+                'tags': 5,
+                'garments': 10,
+                'per_collection': 3,
+            }
+            with transaction.atomic():
+                cases = dict(command._cases(*command._seed(options)))
+                for label, queryset in cases.items():
+                    with self.subTest(size=size, case=label):
+                        with self.assertNumQueries(1):
+                            list(queryset.values_list('pk', flat=True))
+                rows[size] = {
+                    label: rows_before_distinct(cases[label])
+                    for label in (
+                        'garments assigned (join+distinct)',
+                        'garments assigned (exists)',
+                    )
+                }
+                transaction.set_rollback(True)
+
+        self.assertEqual(rows[20]['garments assigned (join+distinct)'], 60)
+        self.assertEqual(rows[40]['garments assigned (join+distinct)'], 120)
+        self.assertEqual(rows[20]['garments assigned (exists)'], 8)
+        self.assertEqual(rows[40]['garments assigned (exists)'], 8)
+
+
+class BenchmarkHashersTests(SimpleTestCase):
+    """Test the password hasher benchmark command"""
+
+    def test_benchmark_reports_profile(self):
+        """Test a profile is timed and marked when it is the default"""
+        out = StringIO()
+
+        with self.settings(PASSWORD_HASHER='scrypt'):
+            call_command('benchmark_hashers', 'scrypt', '--rounds', '1',
+                         stdout=out)
+
+        self.assertIn('scrypt*', out.getvalue())
+        self.assertIn('hashes/s per core', out.getvalue())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer every GET with a small body, failing without a token"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 200 if self.headers.get('Authorization') else 401
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class LoadTestTests(SimpleTestCase):
+    """Test the load test command"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/api/'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_load_test_reports_targets(self):
+        """Test each labelled target is loaded and reported"""
+        out = StringIO()
+
+        call_command(
+            'load_test',
+            f'uwsgi={self.url}',
+            f'asgi={self.url}',
+            '--requests', '20',
+            '--concurrency', '4',
+            '--token', 'abc',
+            stdout=out,
+        )
+
+        self.assertIn('uwsgi: 20 requests, 0 errors', out.getvalue())
+        self.assertIn('asgi: 20 requests, 0 errors', out.getvalue())
+        self.assertIn('req/s per core', out.getvalue())
+
+    def test_load_test_counts_errors(self):
+        """Test error responses are counted"""
+        out = StringIO()
+
+        call_command(
+            'load_test', self.url,
+            '--requests', '4',
+            '--concurrency', '2',
+            stdout=out,
+        )
+
+        self.assertIn('4 requests, 4 errors', out.getvalue())
@@ -0,0 +1,145 @@
+"""
+Tests for content addressed image storage
+"""
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import blobs
+from core.models import (
+    Garment,
+    ImageBlob,
+)
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(garment_id):
+    """Create and return a garment image upload URL"""
+    return reverse("collection:garment-upload-image", args=[garment_id])
+
+
+def sample_image(color='red'):
+    """Return an uploaded JPEG of a solid color"""
+    buffer = BytesIO()
+    Image.new('RGB', (20, 20), color=color).save(buffer, format='JPEG')
+
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageBlobTests(TestCase):
+    """Test deduplicated image storage"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.shirt = Garment.objects.create(user=self.user, name='Shirt')
+        self.skirt = Garment.objects.create(user=self.user, name='Skirt')
+
+    def _upload(self, garment, color='red'):
+        """Upload a sample image to a garment"""
+        res = self.client.post(
+            image_upload_url(garment.id),
+            {'image': sample_image(color)},
+            format='multipart',
+        )
+        self.assertEqual(res.status_code, 200)
+        garment.refresh_from_db()
+
+    def test_identical_uploads_share_file(self):
+        """Test the same bytes uploaded twice are stored once"""
+        self._upload(self.shirt)
+        self._upload(self.skirt)
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(self.shirt.image.name, blob.name)
+        self.assertEqual(self.skirt.image.name, blob.name)
+        self.assertIn(blob.sha256, blob.name)
+
+    def test_renamed_file_recorded(self):
+        """Test the blob keeps the name the storage actually used"""
+        save = default_storage.save
+
+        def rename(name, content):
+            return save(name.replace('.jpg', '_x.jpg'), content)
+
+        with patch.object(default_storage, 'save', side_effect=rename):
+            blob = blobs.store(sample_image())
+
+        self.assertTrue(blob.name.endswith('_x.jpg'))
+        self.assertEqual(ImageBlob.objects.get().name, blob.name)
+        self.assertTrue(default_storage.exists(blob.name))
+
+    def test_reupload_same_image_keeps_count(self):
+        """Test uploading the same image again does not leak a reference"""
+        self._upload(self.shirt)
+        self._upload(self.shirt)
+
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
+    def test_replaced_image_removed(self):
+        """Test replacing the only reference deletes the old file"""
+        self._upload(self.shirt, 'red')
+        old_name = self.shirt.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._upload(self.shirt, 'blue')
+
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(ImageBlob.objects.count(), 1)
+
+    def test_delete_releases_shared_file(self):
+        """Test the file survives until its last garment is deleted"""
+        self._upload(self.shirt)
+        self._upload(self.skirt)
+        name = self.shirt.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shirt.delete()
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.skirt.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_release_keeps_file_stored_again(self):
+        """Test a released file stored again before cleanup is kept"""
+        blob = blobs.store(sample_image())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            blobs.release(blob.name)
+        stored = blobs.store(sample_image())
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(stored.name, blob.name)
+        self.assertTrue(default_storage.exists(blob.name))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
@@ -0,0 +1,175 @@
+"""
+Tests for denormalized relation counters
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+
+from core import counters
+from core.models import (
+    Collection,
+    Garment,
+    Tag,
+)
+
+
+class RelationCounterTests(TestCase):
+    """Test counters follow changes to collection relations"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.collection = Collection.objects.create(
+            user=self.user,
+            title='Summer',
+        )
+        self.tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Beach', 'Casual')
+        ]
+        self.garment = Garment.objects.create(user=self.user, name='Shirt')
+
+    def assertCounts(self, tag_count, garment_count, tag_counts):
+        """Check stored counters against expected values"""
+        self.collection.refresh_from_db()
+        self.assertEqual(self.collection.tag_count, tag_count)
+        self.assertEqual(self.collection.garment_count, garment_count)
+        self.assertEqual(
+            [
+                Tag.objects.get(pk=tag.pk).collection_count
+                for tag in self.tags
+            ],
+            tag_counts,
+        )
+
+    def test_add_and_remove_links(self):
+        """Test adding and removing links shifts both sides"""
+        self.collection.tags.add(*self.tags)
+        self.collection.garments.add(self.garment)
+        self.assertCounts(2, 1, [1, 1])
+
+        self.collection.tags.remove(self.tags[0])
+        self.assertCounts(1, 1, [0, 1])
+
+        self.garment.collection_set.clear()
+        self.assertCounts(1, 0, [0, 1])
+
+    def test_adding_existing_link_is_ignored(self):
+        """Test re-adding a linked tag leaves the counters alone"""
+        self.collection.tags.add(self.tags[0])
+        self.collection.tags.add(self.tags[0])
+
+        self.assertCounts(1, 0, [1, 0])
+
+    def concurrently(self, action, change):
+        """Apply a change as if another request ran it before the write"""
+        through = Collection.tags.through
+
+        def handler(sender, action=None, **kwargs):
+            if action == expected:
+                change(through)
+                counters.recount_links('tags', [self.collection.pk], [
+                    tag.pk for tag in self.tags
+                ])
+
+        expected = action
+        m2m_changed.connect(handler, sender=through)
+        self.addCleanup(m2m_changed.disconnect, handler, sender=through)
+
+    def test_concurrent_remove_counts_once(self):
+        """Test a link removed by two requests is only decremented once"""
+        self.collection.tags.add(self.tags[0])
+        self.concurrently('pre_remove', lambda through: through.objects.filter(
+            collection=self.collection,
+        ).delete())
+
+        self.collection.tags.remove(self.tags[0])
+
+        self.assertCounts(0, 0, [0, 0])
+
+    def test_concurrent_add_counts_once(self):
+        """Test a link added by two requests is only incremented once"""
+        self.concurrently('pre_add', lambda through: through.objects.create(
+            collection=self.collection,
+            tag=self.tags[0],
+        ))
+
+        self.collection.tags.add(self.tags[0])
+
+        self.assertCounts(1, 0, [1, 0])
+        self.assertEqual(self.collection.tag_count, 1)
+
+    def test_delete_releases_counters(self):
+        """Test deleting either side decrements the other"""
+        other = Collection.objects.create(user=self.user, title='Winter')
+        self.collection.tags.add(*self.tags)
+        other.tags.add(self.tags[0])
+
+        self.tags.pop().delete()
+        self.assertCounts(1, 0, [2])
+
+        other.delete()
+        self.assertCounts(1, 0, [1])
+
+    def test_delete_item_linked_to_several_collections(self):
+        """Test deleting a shared tag recounts every collection once"""
+        others = [
+            Collection.objects.create(user=self.user, title=title)
+            for title in ('Winter', 'Spring')
+        ]
+        for collection in [self.collection, *others]:
+            collection.tags.add(*self.tags)
+
+        self.tags.pop(0).delete()
+
+        self.assertCounts(1, 0, [3])
+        for collection in others:
+            collection.refresh_from_db()
+            self.assertEqual(collection.tag_count, 1)
+
+    def test_delete_recounts_stale_counters(self):
+        """Test deletes recount from links rather than subtracting"""
+        self.collection.tags.add(*self.tags)
+        self.collection.garments.add(self.garment)
+        Collection.objects.update(tag_count=0)
+
+        self.tags.pop(0).delete()
+        self.assertCounts(1, 1, [1])
+
+        Garment.objects.update(collection_count=0)
+        self.collection.delete()
+        self.assertEqual(
+            Tag.objects.get(pk=self.tags[0].pk).collection_count,
+            0,
+        )
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.collection_count, 0)
+
+    def test_save_keeps_counters(self):
+        """Test saving a stale instance does not overwrite counters"""
+        stale = Collection.objects.get(pk=self.collection.pk)
+        self.collection.tags.add(*self.tags)
+
+        stale.title = 'Renamed'
+        stale.save()
+
+        self.assertCounts(2, 0, [1, 1])
+        self.assertEqual(self.collection.title, 'Renamed')
+
+    def test_repair_counters(self):
+        """Test the repair command corrects drifted counters"""
+        self.collection.tags.add(*self.tags)
+        Collection.objects.update(tag_count=99)
+        Tag.objects.filter(pk=self.tags[0].pk).update(collection_count=0)
+
+        out = StringIO()
+        call_command('repair_counters', '--batch-size', '1', stdout=out)
+
+        self.assertCounts(2, 0, [1, 1])
+        self.assertIn('Collection.tag_count: corrected 1', out.getvalue())
+        self.assertIn('Repaired 2 counters', out.getvalue())
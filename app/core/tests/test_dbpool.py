@@ -0,0 +1,144 @@
+"""
+Tests for the database connection pool
+"""
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import dbpool
+
+
+DB_POOL_URL = reverse('db-pool-stats')
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection"""
+
+    def __init__(self, broken=False):
+        self.closed = 0
+        self.broken = broken
+
+    def rollback(self):
+        if self.broken:
+            raise OSError('connection lost')
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test lending and returning connections"""
+
+    def setUp(self):
+        self.pool = dbpool.ConnectionPool(max_size=2, timeout=0.05)
+
+    def test_reuses_released_connection(self):
+        """Test a released connection is lent again"""
+        first = self.pool.acquire(FakeConnection)
+        self.pool.release(first)
+
+        self.assertIs(self.pool.acquire(FakeConnection), first)
+        stats = self.pool.stats()
+        self.assertEqual((stats['size'], stats['in_use']), (1, 1))
+
+    def test_timeout_when_exhausted(self):
+        """Test waiting for a connection fails after the timeout"""
+        self.pool.acquire(FakeConnection)
+        self.pool.acquire(FakeConnection)
+
+        with self.assertRaises(dbpool.PoolTimeout):
+            self.pool.acquire(FakeConnection)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['waits'], 0)
+
+    def test_waits_for_release(self):
+        """Test a waiting thread gets the next released connection"""
+        self.pool.timeout = 5
+        held = [self.pool.acquire(FakeConnection) for _ in range(2)]
+        timer = threading.Timer(0.02, self.pool.release, [held[0]])
+        timer.start()
+
+        connection = self.pool.acquire(FakeConnection)
+        timer.join()
+
+        self.assertIs(connection, held[0])
+        stats = self.pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['max_wait_ms'], 0)
+
+    def test_broken_connection_discarded(self):
+        """Test connections failing to reset are closed and forgotten"""
+        connection = self.pool.acquire(lambda: FakeConnection(broken=True))
+        self.pool.release(connection)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(self.pool.stats()['size'], 0)
+
+    def test_failed_check_reopens(self):
+        """Test idle connections failing the check are replaced"""
+        stale = self.pool.acquire(FakeConnection)
+        self.pool.release(stale)
+
+        connection = self.pool.acquire(FakeConnection, check=lambda c: False)
+
+        self.assertIsNot(connection, stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(self.pool.stats()['size'], 1)
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failed connect does not use up the pool"""
+        def connect():
+            raise OSError('refused')
+
+        with self.assertRaises(OSError):
+            self.pool.acquire(connect)
+
+        self.assertEqual(self.pool.stats()['size'], 0)
+        self.assertEqual(self.pool.stats()['in_use'], 0)
+
+
+class DatabasePoolStatsApiTests(TestCase):
+    """Test the internal pool statistics endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_admin_required(self):
+        """Test regular users cannot read pool statistics"""
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(DB_POOL_URL)
+
+        self.assertEqual(res.status_code, 403)
+
+    def test_pool_stats(self):
+        """Test connection settings and pool counters are reported"""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(admin)
+        pool = dbpool.ConnectionPool(max_size=3, timeout=1)
+        pool.acquire(FakeConnection)
+
+        with patch.dict(dbpool.pools, {('default', 'app'): pool}):
+            res = self.client.get(DB_POOL_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('conn_max_age', res.data)
+        self.assertEqual(res.data['pools']['default/app']['in_use'], 1)
+        self.assertEqual(res.data['pools']['default/app']['max_size'], 3)
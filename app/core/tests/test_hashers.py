@@ -0,0 +1,94 @@
+"""
+Tests for password hashers and deferred rehashing
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import (
+    authenticate,
+    get_user_model,
+)
+from django.contrib.auth.hashers import (
+    identify_hasher,
+    make_password,
+)
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from core import hashers
+
+
+class HasherTests(TestCase):
+    """Test hasher profiles and upgrading hashes at login"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def use_old_hash(self):
+        """Store the password with the previous default hasher"""
+        self.user.password = make_password(
+            'testpass123',
+            hasher='pbkdf2_sha256',
+        )
+        self.user.save(update_fields=['password'])
+
+        return self.user.password
+
+    def test_new_passwords_use_profile(self):
+        """Test new hashes use the configured hasher and its cost"""
+        hasher = identify_hasher(self.user.password)
+
+        self.assertIsInstance(hasher, hashers.TunedScryptPasswordHasher)
+        with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 12):
+            self.assertTrue(hasher.must_update(self.user.password))
+
+    def test_login_defers_rehash(self):
+        """Test login does not rehash on the request path"""
+        old = self.use_old_hash()
+
+        with patch('core.hashers._get_executor') as executor:
+            user = authenticate(email='user@example.com',
+                                password='testpass123')
+
+        self.assertEqual(user, self.user)
+        executor.return_value.submit.assert_called_once_with(
+            hashers._run_rehash, self.user.pk, 'testpass123', old,
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, old)
+
+    @override_settings(PASSWORD_REHASH_WORKERS=0)
+    def test_rehash_upgrades_hash(self):
+        """Test the rehash stores a hash from the current profile"""
+        self.use_old_hash()
+
+        authenticate(email='user@example.com', password='testpass123')
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    def test_rehash_skips_changed_password(self):
+        """Test a rehash does not overwrite a newer password"""
+        old = self.use_old_hash()
+        self.user.set_password('newpass123')
+        self.user.save()
+
+        updated = hashers.rehash(self.user.pk, 'testpass123', old)
+
+        self.assertEqual(updated, 0)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass123'))
+
+    def test_bad_password_rejected(self):
+        """Test wrong passwords and unknown emails do not authenticate"""
+        self.assertIsNone(
+            authenticate(email='user@example.com', password='wrong')
+        )
+        self.assertIsNone(
+            authenticate(email='other@example.com', password='testpass123')
+        )
@@ -1,11 +1,29 @@
 """
 Tests for the health check API
 """
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    override_settings,
+)
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 
+from core import (
+    health,
+    views,
+)
+
+
+LIVE_URL = reverse('health-live')
+READY_URL = reverse('health-ready')
+MEDIA_ROOT = tempfile.mkdtemp()
+
 
 class HealthCheckTests(TestCase):
     """Test the health check API"""
@@ -17,3 +35,96 @@ class HealthCheckTests(TestCase):
         res = client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    async def test_async_health_check(self):
+        """Test the health check served under ASGI"""
+        request = AsyncRequestFactory().get('/api/health-check/')
+
+        res = await views.async_health_check(request)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertJSONEqual(res.content, {'healthy': True})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ProbeTests(TestCase):
+    """Test the liveness and readiness probes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        health.readiness.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_liveness(self):
+        """Test liveness answers without checking dependencies"""
+        with patch.object(health, 'run_checks') as run_checks:
+            res = self.client.get(LIVE_URL)
+
+        self.assertEqual(res.status_code, 200)
+        run_checks.assert_not_called()
+
+    def test_readiness(self):
+        """Test readiness reports each dependency with its latency"""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.data['ready'])
+        self.assertEqual(
+            set(res.data['checks']),
+            {'database', 'media', 'cache'},
+        )
+        for result in res.data['checks'].values():
+            self.assertTrue(result['ok'])
+            self.assertGreaterEqual(result['latency_ms'], 0)
+
+    def test_cache_probe_uses_own_key(self):
+        """Test each cache probe writes its own key and removes it"""
+        with patch.object(
+            health.cache,
+            'set',
+            wraps=health.cache.set,
+        ) as cache_set:
+            health.check_cache()
+            health.check_cache()
+
+        keys = [call.args[0] for call in cache_set.call_args_list]
+        self.assertEqual(len(set(keys)), 2)
+        self.assertEqual(health.cache.get_many(keys), {})
+
+    def test_readiness_failure(self):
+        """Test a failing dependency makes the instance unready"""
+        def failing():
+            raise OSError('storage unavailable')
+
+        with patch.dict(health.CHECKS, {'media': failing}):
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.data['ready'])
+        self.assertEqual(res.data['checks']['media']['error'], 'OSError')
+        self.assertTrue(res.data['checks']['database']['ok'])
+
+    @override_settings(HEALTH_MAX_LATENCY_MS=-1)
+    def test_readiness_slow(self):
+        """Test dependencies slower than the limit fail readiness"""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.data['checks']['database']['error'], 'slow')
+
+    def test_readiness_cached(self):
+        """Test probes within the TTL reuse the last report"""
+        report = {'ready': True, 'checks': {}}
+        with patch.object(
+            health,
+            'run_checks',
+            return_value=report,
+        ) as run_checks:
+            health.readiness.get(health.run_checks)
+            health.readiness.get(health.run_checks)
+
+        run_checks.assert_called_once()
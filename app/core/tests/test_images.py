@@ -0,0 +1,80 @@
+"""
+Tests for image variants
+"""
+import shutil
+import tempfile
+from io import (
+    BytesIO,
+    StringIO,
+)
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from core import images
+from core.models import Garment
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def sample_image(size=(2000, 1000), name='photo.jpg'):
+    """Return an uploaded JPEG of the given size"""
+    buffer = BytesIO()
+    Image.new('RGB', size, color='red').save(buffer, format='JPEG')
+
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantTests(TestCase):
+    """Test generating resized variants"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.garment = Garment.objects.create(
+            user=user,
+            name='Coat',
+            image=sample_image(),
+        )
+
+    def test_variant_name(self):
+        """Test variant names sit next to the original"""
+        name = images.variant_name('uploads/garment/abc.png', 512, 'webp')
+
+        self.assertEqual(name, 'uploads/garment/abc_512.webp')
+
+    def test_generate_variants(self):
+        """Test every variant is written at its bounding size"""
+        images.generate_variants(self.garment.image)
+
+        storage = self.garment.image.storage
+        for size in images.VARIANT_SIZES:
+            for fmt in images.VARIANT_FORMATS:
+                name = images.variant_name(self.garment.image.name, size, fmt)
+                with storage.open(name) as variant:
+                    width, height = Image.open(variant).size
+                self.assertEqual((width, height), (size, size // 2))
+
+    def test_backfill_command(self):
+        """Test the backfill command generates missing variants"""
+        self.assertFalse(images.has_variants(self.garment.image))
+
+        call_command('generate_image_variants', stdout=StringIO())
+
+        self.assertTrue(images.has_variants(self.garment.image))
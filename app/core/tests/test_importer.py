@@ -0,0 +1,142 @@
+"""
+Tests for the wardrobe import command
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import (
+    Collection,
+    Garment,
+    Tag,
+)
+
+
+def write_file(suffix, content):
+    """Write content to a temporary file and return its path"""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+
+    return path
+
+
+class ImportWardrobeTests(TestCase):
+    """Test importing wardrobe records"""
+
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+
+    def run_import(self, suffix, content, *args):
+        """Import content from a temporary file and return the output"""
+        path = write_file(suffix, content)
+        self.paths.append(path)
+        out = StringIO()
+        call_command('import_wardrobe', path, *args, stdout=out)
+
+        return out.getvalue()
+
+    def test_import_ndjson(self):
+        """Test importing users and their records from NDJSON"""
+        records = [
+            {'type': 'user', 'id': 7, 'email': 'legacy@example.com'},
+            {'type': 'tag', 'id': 1, 'user': 7, 'name': 'Summer'},
+            {'type': 'garment', 'id': 2, 'user': 7, 'name': 'Shirt'},
+            {
+                'type': 'collection',
+                'id': 3,
+                'user': 7,
+                'title': 'Beach',
+                'tags': [1],
+                'garments': [2, 99],
+            },
+            {'type': 'collection', 'user': 8, 'title': 'Orphan'},
+        ]
+        content = '\n'.join(json.dumps(record) for record in records)
+
+        out = self.run_import('.ndjson', content, '--batch-size', '1')
+
+        user = get_user_model().objects.get(email='legacy@example.com')
+        self.assertFalse(user.has_usable_password())
+        collection = Collection.objects.get(user=user)
+        self.assertEqual(collection.title, 'Beach')
+        self.assertEqual(
+            list(collection.tags.values_list('name', flat=True)),
+            ['Summer'],
+        )
+        self.assertEqual(
+            list(collection.garments.values_list('name', flat=True)),
+            ['Shirt'],
+        )
+        self.assertIn('records/s', out)
+        self.assertIn('skipped 1 records', out)
+
+    def test_import_csv_for_user(self):
+        """Test importing CSV records into an existing user"""
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        Tag.objects.create(user=user, name='Summer')
+        content = (
+            'type,id,name,title,description,link,tags,garments\n'
+            'tag,1,Summer,,,,,\n'
+            'garment,2,Shirt,,,,,\n'
+            'garment,3,Shorts,,,,,\n'
+            'collection,4,,Beach,Sunny,,1,2;3\n'
+        )
+
+        self.run_import('.csv', content, '--user', user.email)
+
+        self.assertEqual(Tag.objects.filter(user=user).count(), 1)
+        self.assertEqual(Garment.objects.filter(user=user).count(), 2)
+        collection = Collection.objects.get(user=user)
+        self.assertEqual(collection.description, 'Sunny')
+        self.assertEqual(collection.tags.count(), 1)
+        self.assertEqual(collection.garments.count(), 2)
+
+    def test_import_garments_sharing_a_name(self):
+        """Test garments with the same name stay separate records"""
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        existing = Garment.objects.create(user=user, name='White T-shirt')
+        records = [
+            {'type': 'garment', 'id': 1, 'name': 'White T-shirt'},
+            {'type': 'garment', 'id': 2, 'name': 'White T-shirt'},
+            {'type': 'collection', 'title': 'Basics', 'garments': [1]},
+            {'type': 'collection', 'title': 'Gym', 'garments': [2]},
+        ]
+        content = '\n'.join(json.dumps(record) for record in records)
+
+        self.run_import('.ndjson', content, '--user', user.email)
+
+        garments = Garment.objects.filter(user=user, name='White T-shirt')
+        self.assertEqual(garments.count(), 3)
+        linked = [
+            Collection.objects.get(title=title).garments.get()
+            for title in ('Basics', 'Gym')
+        ]
+        self.assertNotEqual(linked[0], linked[1])
+        self.assertNotIn(existing, linked)
+
+    def test_import_invalid_json(self):
+        """Test a malformed line aborts the import"""
+        with self.assertRaises(CommandError):
+            self.run_import('.ndjson', '{"type": "tag"\n')
+
+    def test_import_unknown_user(self):
+        """Test importing into a missing user fails"""
+        with self.assertRaises(CommandError):
+            self.run_import('.ndjson', '', '--user', 'nobody@example.com')
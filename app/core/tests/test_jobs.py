@@ -0,0 +1,132 @@
+"""
+Tests for the image processing queue
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from core import jobs
+from core.models import (
+    Garment,
+    ImageJob,
+    ImageStatus,
+)
+
+
+@override_settings(IMAGE_JOB_MAX_ATTEMPTS=2, IMAGE_JOB_RETRY_DELAY=0)
+@patch('core.jobs.images.generate_variants')
+class ImageJobTests(TestCase):
+    """Test queueing and running image jobs"""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.garment = Garment.objects.create(
+            user=user,
+            name='Coat',
+            image='uploads/garment/coat.jpg',
+        )
+
+    def test_enqueue_marks_pending(self, patched_generate):
+        """Test queueing an image sets it pending once"""
+        jobs.enqueue_image_job(self.garment)
+        jobs.enqueue_image_job(self.garment)
+
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.image_status, ImageStatus.PENDING)
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+    def test_successful_job(self, patched_generate):
+        """Test a processed job marks the image ready"""
+        jobs.enqueue_image_job(self.garment)
+
+        processed = jobs.run_pending_jobs()
+
+        self.assertEqual(processed, 1)
+        patched_generate.assert_called_once()
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.image_status, ImageStatus.READY)
+        self.assertEqual(
+            ImageJob.objects.get().status,
+            ImageJob.Status.DONE,
+        )
+
+    def test_reupload_during_job_stays_pending(self, patched_generate):
+        """Test a job does not mark a newer upload ready"""
+        def reupload(image):
+            self.garment.image = 'uploads/garment/coat-2.jpg'
+            self.garment.save()
+            jobs.enqueue_image_job(self.garment)
+
+        patched_generate.side_effect = reupload
+        job = jobs.enqueue_image_job(self.garment)
+
+        jobs.run_job(jobs.claim_next_job())
+
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.image_status, ImageStatus.PENDING)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+        self.assertTrue(ImageJob.objects.filter(
+            status=ImageJob.Status.PENDING,
+        ).exists())
+
+    def test_replaced_image_skipped(self, patched_generate):
+        """Test a job for an image replaced before it ran is dropped"""
+        jobs.enqueue_image_job(self.garment)
+        job = jobs.claim_next_job()
+        Garment.objects.filter(pk=self.garment.pk).update(
+            image='uploads/garment/coat-2.jpg',
+        )
+        job.target.image = 'uploads/garment/coat.jpg'
+
+        jobs.run_job(job)
+
+        patched_generate.assert_not_called()
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+
+    def test_failed_job_retried_then_failed(self, patched_generate):
+        """Test failing jobs are retried up to the attempt limit"""
+        patched_generate.side_effect = OSError('broken image')
+        jobs.enqueue_image_job(self.garment)
+
+        jobs.run_pending_jobs()
+
+        job = ImageJob.objects.get()
+        self.assertEqual(job.status, ImageJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn('broken image', job.last_error)
+        self.garment.refresh_from_db()
+        self.assertEqual(self.garment.image_status, ImageStatus.FAILED)
+
+    def test_stale_running_job_reclaimed(self, patched_generate):
+        """Test a job abandoned by a crashed worker runs again"""
+        job = jobs.enqueue_image_job(self.garment)
+        ImageJob.objects.filter(pk=job.pk).update(
+            status=ImageJob.Status.RUNNING,
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+        patched_generate.assert_called_once()
+
+    def test_deleted_target_completes(self, patched_generate):
+        """Test a job whose garment is gone finishes without work"""
+        jobs.enqueue_image_job(self.garment)
+        self.garment.delete()
+
+        jobs.run_pending_jobs()
+
+        patched_generate.assert_not_called()
+        self.assertEqual(
+            ImageJob.objects.get().status,
+            ImageJob.Status.DONE,
+        )
@@ -1,6 +1,7 @@
 """
 Test for models
 """
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -76,6 +77,16 @@ class ModelTest(TestCase):
 
         self.assertEqual(str(tag), tag.name)
 
+    def test_tag_name_unique_per_user(self):
+        """Test a user cannot have two tags with the same name"""
+        user = create_user()
+        other = create_user(email='other@example.com')
+        models.Tag.objects.create(user=user, name='Tag1')
+        models.Tag.objects.create(user=other, name='Tag1')
+
+        with self.assertRaises(IntegrityError):
+            models.Tag.objects.create(user=user, name='Tag1')
+
     def test_create_garment(self):
         """Test creating a garment is successful"""
         user = create_user()
@@ -0,0 +1,73 @@
+"""
+Tests for signed expiring tokens
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core import tokens
+from core.models import AccessToken
+
+
+class TokenTests(TestCase):
+    """Test issuing, revoking and purging tokens"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def test_issue_and_read(self):
+        """Test tokens describe their user and are recorded"""
+        key, expires_at = tokens.issue(self.user)
+
+        claims = tokens.read(key)
+        self.assertEqual(claims['uid'], self.user.pk)
+        token = AccessToken.objects.get(jti=claims['jti'])
+        self.assertEqual(token.expires_at, expires_at)
+
+    def test_tampered_and_expired_rejected(self):
+        """Test altered or outdated tokens fail to read"""
+        key, expires_at = tokens.issue(self.user)
+
+        with self.assertRaises(signing.BadSignature):
+            tokens.read(key[:-1] + ('A' if key[-1] != 'A' else 'B'))
+        with self.settings(AUTH_TOKEN_TTL=-1):
+            with self.assertRaises(signing.SignatureExpired):
+                tokens.read(key)
+
+    def test_revoked_ids(self):
+        """Test revoked unexpired tokens form the cached set"""
+        key, expires_at = tokens.issue(self.user)
+        jti = tokens.read(key)['jti']
+        self.assertEqual(tokens.revoked_ids(), frozenset())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(tokens.revoke(jti), 1)
+
+        self.assertEqual(tokens.revoked_ids(), {jti})
+        with self.assertNumQueries(0):
+            tokens.revoked_ids()
+
+    def test_clear_expired_tokens(self):
+        """Test the cleanup command deletes only expired rows"""
+        tokens.issue(self.user)
+        past = timezone.now() - timedelta(seconds=1)
+        AccessToken.objects.bulk_create(
+            AccessToken(jti=f'expired{i}', user=self.user, expires_at=past)
+            for i in range(3)
+        )
+
+        out = StringIO()
+        call_command('clear_expired_tokens', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(AccessToken.objects.count(), 1)
+        self.assertIn('Cleared 3 tokens', out.getvalue())
@@ -0,0 +1,117 @@
+"""
+Signed expiring API tokens with a cached revocation set
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import AccessToken
+
+
+SALT = 'core.tokens'
+REVOKED_KEY = 'auth:revoked'
+
+
+def issue(user):
+    """Record a new token for a user, return its key and expiry"""
+    jti = secrets.token_hex(16)
+    expires_at = timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+    AccessToken.objects.create(jti=jti, user=user, expires_at=expires_at)
+    key = signing.dumps({'jti': jti, 'uid': user.pk}, salt=SALT)
+
+    return key, expires_at
+
+
+def read(key):
+    """Return the claims of a token, raise BadSignature if invalid
+
+    Expired tokens raise SignatureExpired, a BadSignature subclass.
+    """
+    return signing.loads(key, salt=SALT, max_age=settings.AUTH_TOKEN_TTL)
+
+
+def _revoked_queryset():
+    """Return ids of revoked tokens that have not expired yet"""
+    return AccessToken.objects.filter(
+        revoked_at__isnull=False,
+        expires_at__gt=timezone.now(),
+    ).values_list('jti', flat=True)
+
+
+def revoked_ids():
+    """Return ids of revoked tokens that have not expired yet
+
+    The set is small because revoked tokens drop out of it once they
+    expire, so it is cached whole and reloaded after each revocation.
+    """
+    ids = cache.get(REVOKED_KEY)
+    if ids is None:
+        ids = frozenset(_revoked_queryset())
+        cache.set(REVOKED_KEY, ids, settings.AUTH_REVOCATION_CACHE_TIMEOUT)
+
+    return ids
+
+
+async def arevoked_ids():
+    """Async counterpart of revoked_ids"""
+    ids = await cache.aget(REVOKED_KEY)
+    if ids is None:
+        ids = frozenset([jti async for jti in _revoked_queryset()])
+        await cache.aset(
+            REVOKED_KEY,
+            ids,
+            settings.AUTH_REVOCATION_CACHE_TIMEOUT,
+        )
+
+    return ids
+
+
+def _revoke(queryset):
+    """Mark tokens as revoked and reload the set once committed"""
+    revoked = queryset.filter(
+        revoked_at__isnull=True,
+        expires_at__gt=timezone.now(),
+    ).update(revoked_at=timezone.now())
+    if revoked:
+        transaction.on_commit(lambda: cache.delete(REVOKED_KEY))
+
+    return revoked
+
+
+def revoke(jti):
+    """Revoke a single token"""
+    return _revoke(AccessToken.objects.filter(jti=jti))
+
+
+def revoke_user(user_id):
+    """Revoke every token of a user"""
+    return _revoke(AccessToken.objects.filter(user_id=user_id))
+
+
+def rotate(user, jti):
+    """Replace a token with a new one, revoking the old token"""
+    with transaction.atomic():
+        revoke(jti)
+        return issue(user)
+
+
+def clear_expired(batch_size):
+    """Delete expired token rows in batches, yield the rows per batch"""
+    while True:
+        with transaction.atomic():
+            pks = list(
+                AccessToken.objects.filter(
+                    expires_at__lte=timezone.now(),
+                ).order_by('expires_at').values_list('pk', flat=True)[
+                    :batch_size
+                ]
+            )
+            if not pks:
+                return
+            AccessToken.objects.filter(pk__in=pks).delete()
+        yield len(pks)
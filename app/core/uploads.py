@@ -0,0 +1,107 @@
+"""
+Chunk storage for resumable uploads
+"""
+import hashlib
+import mimetypes
+import os
+import shutil
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+
+
+BLOCK_SIZE = 64 * 1024
+
+
+class ChunkError(ValueError):
+    """Raised when a chunk or assembled file is invalid"""
+
+
+def session_dir(session):
+    """Return the directory holding the chunks of a session"""
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, str(session.id))
+
+
+def chunk_path(session, index):
+    """Return the path of a stored chunk"""
+    return os.path.join(session_dir(session), f'{index}.part')
+
+
+def received_chunks(session):
+    """Return the sorted indexes of the chunks stored for a session"""
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+
+    return sorted(
+        int(name[:-len('.part')]) for name in names if name.endswith('.part')
+    )
+
+
+def write_chunk(session, index, stream):
+    """Stream a chunk from a file-like object to disk
+
+    The chunk is written to a temporary file and renamed into place, so a
+    retried or interrupted chunk never leaves a partial file behind.
+    """
+    if not 0 <= index < session.total_chunks:
+        raise ChunkError('Chunk index out of range.')
+
+    expected = session.expected_chunk_size(index)
+    path = chunk_path(session, index)
+    tmp_path = f'{path}.tmp'
+    os.makedirs(session_dir(session), exist_ok=True)
+
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as tmp:
+            while True:
+                block = stream.read(BLOCK_SIZE)
+                if not block:
+                    break
+                written += len(block)
+                if written > expected:
+                    raise ChunkError('Chunk is larger than expected.')
+                tmp.write(block)
+        if written != expected:
+            raise ChunkError(
+                f'Chunk has {written} bytes, expected {expected}.'
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def assemble(session):
+    """Concatenate the chunks into a temporary upload and verify it"""
+    missing = set(range(session.total_chunks)) - set(received_chunks(session))
+    if missing:
+        raise ChunkError(f'Missing chunks: {sorted(missing)}.')
+
+    content_type = mimetypes.guess_type(session.filename)[0]
+    upload = TemporaryUploadedFile(
+        session.filename,
+        content_type or 'application/octet-stream',
+        session.size,
+        None,
+    )
+    digest = hashlib.sha256()
+    for index in range(session.total_chunks):
+        with open(chunk_path(session, index), 'rb') as chunk:
+            for block in iter(lambda: chunk.read(BLOCK_SIZE), b''):
+                digest.update(block)
+                upload.write(block)
+
+    upload.seek(0)
+    if digest.hexdigest() != session.checksum.lower():
+        upload.close()
+        raise ChunkError('Checksum does not match uploaded data.')
+
+    return upload
+
+
+def discard(session):
+    """Remove every stored chunk of a session"""
+    shutil.rmtree(session_dir(session), ignore_errors=True)
@@ -1,11 +1,81 @@
 """
 Core views for app
 """
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from rest_framework import status
 from rest_framework.decorators import api_view
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import (
+    dbpool,
+    health,
+)
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 
 
 @api_view(['GET'])
 def health_check(request):
     """Returns successful health check response"""
     return Response({'healthy': True})
+
+
+@require_safe
+async def async_health_check(request):
+    """Returns successful health check response from the event loop"""
+    return JsonResponse({'healthy': True})
+
+
+@api_view(['GET'])
+def liveness(request):
+    """Report the process is serving requests, touching nothing else"""
+    return Response({'alive': True})
+
+
+@api_view(['GET'])
+def readiness(request):
+    """Report whether the database, media storage and cache respond
+
+    Results are shared for HEALTH_PROBE_TTL seconds so frequent probes
+    do not add load. Answers 503 when any dependency fails or is slow.
+    """
+    report = health.readiness.get()
+
+    return Response(
+        report,
+        status=(
+            status.HTTP_200_OK if report['ready']
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
+
+
+class DatabasePoolStatsView(APIView):
+    """Report database connection settings and pool usage
+
+    Pools live in each worker process, so the counters describe the
+    process that answered.
+    """
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Return the pool counters"""
+        database = settings.DATABASES['default']
+
+        return Response({
+            'pooling': settings.DB_POOL,
+            'conn_max_age': database['CONN_MAX_AGE'],
+            'conn_health_checks': database['CONN_HEALTH_CHECKS'],
+            'pools': dbpool.get_stats(),
+        })
@@ -57,3 +57,9 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class IssuedTokenSerializer(serializers.Serializer):
+    """Serializer for an issued expiring token"""
+    token = serializers.CharField()
+    expires_at = serializers.DateTimeField()
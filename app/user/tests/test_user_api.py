@@ -3,14 +3,20 @@ Test for the user API
 """
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core import authentication
+
 
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse('user:token')
+REFRESH_URL = reverse('user:token-refresh')
+REVOKE_URL = reverse('user:token-revoke')
 ME_URL = reverse('user:me')
 
 
@@ -156,3 +162,195 @@ class PrivateUserApiTest(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class TokenAuthenticationCacheTests(TestCase):
+    """Test token lookups are cached and invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='John Doe',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test repeated requests authenticate without queries"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_cached_user_fields(self):
+        """Test the cache holds no password hash or superuser flag"""
+        self.client.get(ME_URL)
+
+        values = cache.get(authentication.token_key(self.token.key))
+
+        self.assertNotIn(self.user.password, values)
+        user = authentication.user_from_cache(values)
+        self.assertEqual(user.email, self.user.email)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertIn('is_superuser', user.get_deferred_fields())
+
+    def test_password_change_with_cached_user(self):
+        """Test a cached user can change the password and keep other data"""
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {'password': 'newpassword123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpassword123'))
+        self.assertEqual(self.user.name, 'John Doe')
+
+    def test_password_change_invalidates(self):
+        """Test updating the password drops the cached user"""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'password': 'newpassword123'})
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deactivation_invalidates(self):
+        """Test deactivated users are rejected despite a cached token"""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_delete_invalidates(self):
+        """Test deleted tokens are rejected despite a cached lookup"""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SignedTokenApiTests(TestCase):
+    """Test expiring tokens issued by the API"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+        self.client = APIClient()
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+        })
+        self.key = res.data['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def test_token_has_expiry(self):
+        """Test issued tokens report when they expire"""
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+        })
+
+        self.assertIn('expires_at', res.data)
+        self.assertNotEqual(res.data['token'], self.key)
+
+    def test_authenticate_without_queries(self):
+        """Test warm requests validate the token from the cache"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_refresh_rotates_token(self):
+        """Test refreshing returns a new token and revokes the old one"""
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(REFRESH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {res.data["token"]}'
+        )
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+    def test_revoke_token(self):
+        """Test a revoked token is rejected"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(REVOKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_expired_token_rejected(self):
+        """Test tokens older than the TTL are rejected"""
+        with self.settings(AUTH_TOKEN_TTL=-1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test tokens of deactivated users are rejected"""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes_tokens(self):
+        """Test tokens stay revoked after the user is reactivated"""
+        self.client.get(ME_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.user.is_active = True
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_tokens(self):
+        """Test changing the password revokes previously issued tokens"""
+        self.client.get(ME_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(ME_URL, {'password': 'newpassword123'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_change_keeps_tokens(self):
+        """Test saving other fields leaves tokens valid"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(ME_URL, {'name': 'New Name'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -2,13 +2,23 @@
 Views for the user API
 """
 
-from rest_framework import generics, authentication, permissions
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from core import tokens
+from core.asyncviews import AsyncReadMixin
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from user.serializers import (
     UserSerializer,
-    AuthTokenSerializer
+    AuthTokenSerializer,
+    IssuedTokenSerializer,
 )
 
 
@@ -17,18 +27,65 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
+def token_response(key, expires_at):
+    """Return a response describing an issued token"""
+    return Response(
+        IssuedTokenSerializer({'token': key, 'expires_at': expires_at}).data
+    )
+
+
 class CreateTokenView(ObtainAuthToken):
-    """Create a new auth token for user"""
+    """Create a new expiring auth token for user"""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    @extend_schema(responses=IssuedTokenSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return token_response(
+            *tokens.issue(serializer.validated_data['user'])
+        )
+
+
+class RefreshTokenView(APIView):
+    """Replace the current token with a new one and revoke it"""
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses=IssuedTokenSerializer)
+    def post(self, request):
+        return token_response(
+            *tokens.rotate(request.user, request.auth['jti'])
+        )
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+
+class RevokeTokenView(APIView):
+    """Revoke the current token"""
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses={204: None})
+    def post(self, request):
+        tokens.revoke(request.auth['jti'])
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManageUserView(AsyncReadMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        SignedTokenAuthentication,
+        CachedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return authenticated user"""
         return self.request.user
+
+    async def aget_object(self):
+        """Return the authenticated user without a query"""
+        return self.request.user
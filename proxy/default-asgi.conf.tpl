@@ -0,0 +1,20 @@
+server {
+    listen ${LISTEN_PORT};
+
+    location /static {
+        alias /vol/static;
+    }
+
+    location /api/collection/uploads/ {
+        proxy_pass              http://${APP_HOST}:${APP_PORT};
+        include                 /etc/nginx/proxy_params;
+        client_max_body_size    10M;
+        proxy_request_buffering off;
+    }
+
+    location / {
+        proxy_pass              http://${APP_HOST}:${APP_PORT};
+        include                 /etc/nginx/proxy_params;
+        client_max_body_size    10M;
+    }
+}
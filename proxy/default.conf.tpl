@@ -5,6 +5,13 @@ server {
         alias /vol/static;
     }
 
+    location /api/collection/uploads/ {
+        uwsgi_pass              ${APP_HOST}:${APP_PORT};
+        include                 /etc/nginx/uwsgi_params;
+        client_max_body_size    10M;
+        uwsgi_request_buffering off;
+    }
+
     location / {
         uwsgi_pass              ${APP_HOST}:${APP_PORT};
         include                 /etc/nginx/uwsgi_params;
@@ -2,5 +2,11 @@
 
 set -e
 
-envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+if [ "$SERVER_MODE" = "asgi" ]; then
+    TEMPLATE=/etc/nginx/default-asgi.conf.tpl
+else
+    TEMPLATE=/etc/nginx/default.conf.tpl
+fi
+
+envsubst < "$TEMPLATE" > /etc/nginx/conf.d/default.conf
 nginx -g 'daemon off;'
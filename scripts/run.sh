@@ -6,4 +6,11 @@ python manage.py wait_for_db
 python manage.py collectstatic --noinput
 python manage.py migrate
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn app.asgi:application \
+        --bind :9000 \
+        --workers "${WEB_WORKERS:-4}" \
+        --worker-class uvicorn.workers.UvicornWorker
+else
+    uwsgi --socket :9000 --workers "${WEB_WORKERS:-4}" --master --enable-threads --module app.wsgi
+fi